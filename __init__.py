@@ -1,46 +1,71 @@
-from .image_preview_compare import ImagePreviewCompare
-from .image_size_processor import ImageSizeProcessorNode
-from .youtube_thumbnail_extractor import YouTubeThumbnailExtractor
-from .random_person_photo import RandomPersonPhoto
-from .toggle_text_node import ToggleTextNode
-from .toggle_lora_stack_node import ToggleLoraStackNode
-from .lora_and_text_combiner_node import LoraAndTextCombinerNode
-from .character_loader_node import CharacterLoaderNode
-import os
-
-# Get the absolute path to the web directory
-current_dir = os.path.dirname(os.path.abspath(__file__))
-web_dir = os.path.join(current_dir, "web/comfyui")
-
-print(f"Custom node directory: {current_dir}")
-print(f"Web directory: {web_dir}")
-print(f"Web directory exists: {os.path.exists(web_dir)}")
-if os.path.exists(web_dir):
-    print(f"Web files: {os.listdir(web_dir)}")
-
-NODE_CLASS_MAPPINGS = {
-    "ImagePreviewCompare": ImagePreviewCompare,
-    "ImageSizeProcessor": ImageSizeProcessorNode,
-    "YouTubeThumbnailExtractor": YouTubeThumbnailExtractor,
-    "RandomPersonPhoto": RandomPersonPhoto,
-    "ToggleTextNode": ToggleTextNode,
-    "ToggleLoraStackNode": ToggleLoraStackNode,
-    "LoraAndTextCombiner": LoraAndTextCombinerNode,
-    "CharacterLoaderNode": CharacterLoaderNode,
-}
+import importlib
+from collections.abc import Mapping
 
-NODE_DISPLAY_NAME_MAPPINGS = {
-    "ImagePreviewCompare": "Image Preview Compare",
-    "ImageSizeProcessor": "Image Size Processor",
-    "YouTubeThumbnailExtractor": "YouTube Thumbnail Extractor",
-    "RandomPersonPhoto": "Random Person Photo",
-    "ToggleTextNode": "Toggle Text",
-    "ToggleLoraStackNode": "Toggle Lora Stack",
-    "LoraAndTextCombiner": "Lora and Text Combiner",
-    "CharacterLoaderNode": "Character Loader",
+# Node name -> (module, class name, display name). Modules are only imported
+# when a node class is first looked up, see LazyNodeClassMappings.
+NODE_REGISTRY = {
+    "ImagePreviewCompare": ("image_preview_compare", "ImagePreviewCompare", "Image Preview Compare"),
+    "ImageSizeProcessor": ("image_size_processor", "ImageSizeProcessorNode", "Image Size Processor"),
+    "YouTubeThumbnailExtractor": ("youtube_thumbnail_extractor", "YouTubeThumbnailExtractor", "YouTube Thumbnail Extractor"),
+    "RandomPersonPhoto": ("random_person_photo", "RandomPersonPhoto", "Random Person Photo"),
+    "ToggleTextNode": ("toggle_text_node", "ToggleTextNode", "Toggle Text"),
+    "ToggleLoraStackNode": ("toggle_lora_stack_node", "ToggleLoraStackNode", "Toggle Lora Stack"),
+    "LoraAndTextCombiner": ("lora_and_text_combiner_node", "LoraAndTextCombinerNode", "Lora and Text Combiner"),
+    "CharacterLoaderNode": ("character_loader_node", "CharacterLoaderNode", "Character Loader"),
+    "FolderImageSource": ("folder_image_source", "FolderImageSource", "Folder Image Source"),
 }
 
+class LazyNodeClassMappings(Mapping):
+    """
+    Read-only mapping of node name to class that imports each node module on
+    first access. Heavy third-party imports (requests, imageio, cv2) are
+    further deferred inside the modules until a node actually executes.
+    """
+
+    def __init__(self, registry):
+        self.registry = registry
+        self.classes = {}
+
+    def __getitem__(self, name):
+        if name not in self.classes:
+            module_name, class_name, _ = self.registry[name]
+            module = importlib.import_module(f".{module_name}", __name__)
+            self.classes[name] = getattr(module, class_name)
+        return self.classes[name]
+
+    def __iter__(self):
+        return iter(self.registry)
+
+    def __len__(self):
+        return len(self.registry)
+
+NODE_CLASS_MAPPINGS = LazyNodeClassMappings(NODE_REGISTRY)
+
+def _resolve_node_class(name):
+    return NODE_CLASS_MAPPINGS[name] if name in NODE_REGISTRY else None
+
+def _register_server_hooks():
+    # Routes must exist before the first request, independently of node loading
+    from server import PromptServer
+    from .character_presets import register_routes as register_preset_routes
+    from .compare_batch_store import register_routes as register_compare_routes
+    from .instrumentation import register_routes as register_metrics_routes
+    from .lora_catalog import register_routes as register_lora_routes
+    from .network_prefetch import make_prompt_handler
+
+    server = PromptServer.instance
+    register_compare_routes(server.routes)
+    register_metrics_routes(server.routes)
+    register_preset_routes(server.routes)
+    register_lora_routes(server.routes)
+    # Network nodes start downloading when a prompt is queued, not when it runs
+    server.add_on_prompt_handler(make_prompt_handler(_resolve_node_class))
+
+_register_server_hooks()
+
+NODE_DISPLAY_NAME_MAPPINGS = {name: entry[2] for name, entry in NODE_REGISTRY.items()}
+
 # Register web directory for JavaScript files
 WEB_DIRECTORY = "./web/comfyui"
 
-__all__ = ["NODE_CLASS_MAPPINGS", "NODE_DISPLAY_NAME_MAPPINGS", "WEB_DIRECTORY"] 
\ No newline at end of file
+__all__ = ["NODE_CLASS_MAPPINGS", "NODE_DISPLAY_NAME_MAPPINGS", "WEB_DIRECTORY"]
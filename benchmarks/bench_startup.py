@@ -0,0 +1,75 @@
+"""
+Startup benchmark: time to import the pack and to resolve every node class,
+each measured in a fresh interpreter with ComfyUI's modules stubbed out.
+
+    python benchmarks/bench_startup.py --runs 10 --output startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# torch, numpy and PIL are already loaded by ComfyUI before custom nodes, so
+# they are imported before timing starts.
+CHILD_SCRIPT = r"""
+import json, sys, time
+sys.path.insert(0, {bench_dir!r})
+import comfy_stubs
+comfy_stubs.install()
+for preloaded in ("torch", "numpy", "PIL.Image"):
+    try:
+        __import__(preloaded)
+    except ImportError:
+        pass
+heavy = ("requests", "imageio", "cv2")
+start = time.perf_counter()
+pack = comfy_stubs.load_pack()
+imported = time.perf_counter()
+error = None
+try:
+    for name, node_cls in pack.NODE_CLASS_MAPPINGS.items():
+        pass
+except ImportError as e:
+    error = str(e)
+resolved = time.perf_counter()
+print(json.dumps({{
+    "import_s": imported - start,
+    "resolve_s": resolved - imported,
+    "heavy_modules_loaded": [m for m in heavy if m in sys.modules],
+    "error": error,
+}}))
+"""
+
+def run_once():
+    bench_dir = os.path.dirname(os.path.abspath(__file__))
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD_SCRIPT.format(bench_dir=bench_dir)],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    samples = [run_once() for _ in range(args.runs)]
+    result = {
+        "benchmark": "startup",
+        "runs": args.runs,
+        "import_s_median": statistics.median(s["import_s"] for s in samples),
+        "resolve_s_median": statistics.median(s["resolve_s"] for s in samples),
+        "heavy_modules_loaded": samples[-1]["heavy_modules_loaded"],
+        "error": samples[-1]["error"],
+    }
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Minimal stand-ins for the ComfyUI modules the pack imports (nodes,
+folder_paths, server) so the nodes can be loaded and timed outside ComfyUI.
+"""
+import importlib.util
+import os
+import sys
+import tempfile
+import types
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE_NAME = "cyan_image_nodes"
+
+class _RouteTable:
+    """Records handlers registered through the aiohttp-style decorators."""
+
+    def __init__(self):
+        self.handlers = {}
+
+    def _register(self, method, path):
+        def decorator(handler):
+            self.handlers[(method, path)] = handler
+            return handler
+        return decorator
+
+    def get(self, path):
+        return self._register("GET", path)
+
+    def post(self, path):
+        return self._register("POST", path)
+
+class _PromptServer:
+    instance = None
+
+    def __init__(self):
+        self.routes = _RouteTable()
+        self.on_prompt_handlers = []
+
+    def add_on_prompt_handler(self, handler):
+        self.on_prompt_handlers.append(handler)
+
+def install(base_path=None):
+    """Install the stub modules into sys.modules and return the base path used."""
+    if "folder_paths" in sys.modules and getattr(sys.modules["folder_paths"], "_is_stub", False):
+        return sys.modules["folder_paths"].base_path
+    base_path = base_path or tempfile.mkdtemp(prefix="cyan_image_bench_")
+
+    folder_paths = types.ModuleType("folder_paths")
+    folder_paths._is_stub = True
+    folder_paths.base_path = base_path
+    folder_paths.supported_pt_extensions = {".ckpt", ".pt", ".bin", ".pth", ".safetensors"}
+    folder_paths.folder_names_and_paths = {
+        "loras": ([os.path.join(base_path, "models", "loras")], {".safetensors", ".pt", ".ckpt"}),
+    }
+
+    def add_model_folder_path(folder_name, full_folder_path, is_default=False):
+        paths, extensions = folder_paths.folder_names_and_paths.setdefault(folder_name, ([], set()))
+        if full_folder_path not in paths:
+            paths.append(full_folder_path)
+
+    def get_folder_paths(folder_name):
+        return list(folder_paths.folder_names_and_paths.get(folder_name, ([], set()))[0])
+
+    def get_filename_list(folder_name):
+        names = []
+        for root in get_folder_paths(folder_name):
+            for directory, _, filenames in os.walk(root):
+                names.extend(os.path.relpath(os.path.join(directory, f), root) for f in filenames)
+        return sorted(names)
+
+    folder_paths.add_model_folder_path = add_model_folder_path
+    folder_paths.get_folder_paths = get_folder_paths
+    folder_paths.get_filename_list = get_filename_list
+    folder_paths.get_temp_directory = lambda: os.path.join(base_path, "temp")
+    folder_paths.get_input_directory = lambda: os.path.join(base_path, "input")
+    folder_paths.get_output_directory = lambda: os.path.join(base_path, "output")
+    folder_paths.get_user_directory = lambda: os.path.join(base_path, "user")
+
+    nodes = types.ModuleType("nodes")
+
+    class PreviewImage:
+        """Saves previews like ComfyUI's PreviewImage, as PNGs in the temp directory."""
+
+        def __init__(self):
+            self.output_dir = folder_paths.get_temp_directory()
+            self.type = "temp"
+            self.counter = 0
+
+        def save_images(self, images, filename_prefix="ComfyUI", prompt=None, extra_pnginfo=None):
+            import numpy as np
+            from PIL import Image
+
+            os.makedirs(self.output_dir, exist_ok=True)
+            results = []
+            for image in images:
+                array = np.clip(image.cpu().numpy() * 255.0, 0, 255).astype(np.uint8)
+                filename = f"{filename_prefix}_{self.counter:05}_.png"
+                self.counter += 1
+                Image.fromarray(array).save(os.path.join(self.output_dir, filename), compress_level=1)
+                results.append({"filename": filename, "subfolder": "", "type": self.type})
+            return {"ui": {"images": results}}
+
+    nodes.PreviewImage = PreviewImage
+
+    server = types.ModuleType("server")
+    server.PromptServer = _PromptServer
+    _PromptServer.instance = _PromptServer()
+
+    sys.modules["folder_paths"] = folder_paths
+    sys.modules["nodes"] = nodes
+    sys.modules["server"] = server
+    return base_path
+
+def load_pack():
+    """Import the repository as a package (its directory name isn't importable)."""
+    if PACKAGE_NAME in sys.modules:
+        return sys.modules[PACKAGE_NAME]
+    spec = importlib.util.spec_from_file_location(
+        PACKAGE_NAME,
+        os.path.join(PACKAGE_DIR, "__init__.py"),
+        submodule_search_locations=[PACKAGE_DIR],
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[PACKAGE_NAME] = module
+    spec.loader.exec_module(module)
+    return module
+
+def load_module(name):
+    """Import one node module of the pack, e.g. load_module("image_size_processor")."""
+    load_pack()
+    return importlib.import_module(f"{PACKAGE_NAME}.{name}")
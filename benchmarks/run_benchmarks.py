@@ -0,0 +1,334 @@
+"""
+Reproducible benchmarks for the pack's image, video and network paths.
+
+ComfyUI's nodes/folder_paths/server modules are replaced by the stubs in
+comfy_stubs.py, videos are generated synthetically and network nodes talk
+to a local stub HTTP server, so results only depend on this machine.
+
+    python benchmarks/run_benchmarks.py --output baseline.json
+    python benchmarks/run_benchmarks.py --output change.json --compare baseline.json
+    python benchmarks/run_benchmarks.py --quick --only image_size_processor_node
+
+Every result reports latency percentiles, throughput and the process peak
+RSS at the time the benchmark finished (peak RSS is cumulative, use --only
+to measure one benchmark in isolation).
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+
+import comfy_stubs
+
+BASE_PATH = comfy_stubs.install()
+
+import numpy as np
+import torch
+from PIL import Image
+
+SEED = 1234
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[index]
+
+def measure(name, params, fn, repeat, items=1, warmup=1):
+    for _ in range(warmup):
+        fn()
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+    result = {
+        "name": name,
+        "params": params,
+        "repeat": repeat,
+        "items": items,
+        "mean_s": statistics.mean(latencies),
+        "p50_s": percentile(latencies, 50),
+        "p90_s": percentile(latencies, 90),
+        "p99_s": percentile(latencies, 99),
+        "throughput_items_s": items * repeat / sum(latencies) if sum(latencies) > 0 else None,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+    print(f"{name:32} {json.dumps(params):60} p50 {result['p50_s'] * 1000:9.2f} ms  "
+          f"{result['throughput_items_s'] or 0:9.1f} items/s")
+    return result
+
+def random_image_batch(batch_size, width, height):
+    generator = torch.Generator().manual_seed(SEED)
+    return torch.rand((batch_size, height, width, 3), generator=generator)
+
+class DummyUpscaleModel:
+    """4x nearest-neighbour stand-in for an UPSCALE_MODEL, called on [1, C, H, W]."""
+
+    def __call__(self, image):
+        return torch.nn.functional.interpolate(image, scale_factor=4, mode="nearest")
+
+def bench_process_image(args):
+    module = comfy_stubs.load_module("image_size_processor")
+    processor = module.ImageSizeProcessor()
+    results = []
+    for width, height in [(512, 512), (1024, 768), (2048, 1536), (384, 640)]:
+        for method in ["lanczos", "nearest"]:
+            image = Image.fromarray(np.random.RandomState(SEED).randint(0, 255, (height, width, 3), dtype=np.uint8))
+            results.append(measure(
+                "process_image", {"size": f"{width}x{height}", "resize_method": method},
+                lambda: processor.process_image(image, None, method, 2.0),
+                args.repeat,
+            ))
+    return results
+
+def bench_image_size_processor_node(args):
+    module = comfy_stubs.load_module("image_size_processor")
+    node = module.ImageSizeProcessorNode()
+    batch_sizes = [1, 4] if args.quick else [1, 4, 16, 64]
+    resolutions = [(512, 512), (1216, 832)] if args.quick else [(512, 512), (640, 960), (1216, 832), (2048, 2048)]
+    results = []
+    for batch_size in batch_sizes:
+        for width, height in resolutions:
+            image = random_image_batch(batch_size, width, height)
+            for upscale_model in [None, DummyUpscaleModel()]:
+                for auto_select in [False, True]:
+                    params = {
+                        "batch": batch_size,
+                        "size": f"{width}x{height}",
+                        "upscaler": upscale_model is not None,
+                        "auto_select": auto_select,
+                    }
+                    results.append(measure(
+                        "image_size_processor_node", params,
+                        lambda: node.process(image, "SDXL - Square (1024x1024)", "SD 2.x - Square (768x768)",
+                                             upscale_model, auto_select, upscale_model is not None, "lanczos", 2.0),
+                        max(1, args.repeat // batch_size), items=batch_size, warmup=0,
+                    ))
+    return results
+
+def bench_image_cache(args):
+    module = comfy_stubs.load_module("image_size_processor")
+    results = []
+    for width, height in [(512, 512), (1024, 1024)]:
+        cache = module.ImageCache(max_size=32)
+        images = [random_image_batch(1, width, height)[0] + i for i in range(48)]
+        for image in images[:32]:
+            cache.put(image, 2.0, image)
+        results.append(measure(
+            "image_cache_get_hit", {"size": f"{width}x{height}"},
+            lambda: cache.get(images[0], 2.0), args.repeat,
+        ))
+        counter = iter(range(10 ** 9))
+        results.append(measure(
+            "image_cache_put_evict", {"size": f"{width}x{height}"},
+            lambda: cache.put(images[32 + next(counter) % 16], 2.0, images[0]), args.repeat,
+        ))
+    return results
+
+def make_synthetic_video(width, height, frames, fps=24):
+    import cv2
+
+    videos_dir = os.path.join(BASE_PATH, "videos")
+    os.makedirs(videos_dir, exist_ok=True)
+    filename = f"synthetic_{width}x{height}_{frames}.mp4"
+    path = os.path.join(videos_dir, filename)
+    if not os.path.exists(path):
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+        x = np.linspace(0, 255, width, dtype=np.float32)[None, :]
+        y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+        for i in range(frames):
+            frame = np.stack([(x + i * 3) % 256 + 0 * y, (y + i * 5) % 256 + 0 * x, (x + y + i) % 256], axis=-1)
+            writer.write(frame.astype(np.uint8))
+        writer.release()
+    return filename
+
+def bench_video_thumbnail_extractor(args):
+    module = comfy_stubs.load_module("video_thumbnail_extractor")
+    node = module.VideoThumbnailExtractor()
+    results = []
+    for width, height in [(640, 360), (1920, 1080)]:
+        filename = make_synthetic_video(width, height, 48 if args.quick else 240)
+        for frame_number in [1, 24, 10 ** 6]:
+            results.append(measure(
+                "video_thumbnail_extractor", {"size": f"{width}x{height}", "frame": frame_number},
+                lambda: node.extract_thumbnail(filename, frame_number), args.repeat,
+            ))
+    return results
+
+def make_image_folder(width, height, count):
+    folder = os.path.join(BASE_PATH, "image_folders", f"synthetic_{width}x{height}_{count}")
+    if not os.path.isdir(folder):
+        os.makedirs(folder)
+        for i in range(count):
+            array = np.random.RandomState(SEED + i).randint(0, 255, (height, width, 3), dtype=np.uint8)
+            Image.fromarray(array).save(os.path.join(folder, f"frame_{i:05d}.jpg"), quality=90)
+    return os.path.basename(folder)
+
+def bench_folder_image_source(args):
+    module = comfy_stubs.load_module("folder_image_source")
+    node = module.FolderImageSource()
+    results = []
+    count = 32 if args.quick else 128
+    for width, height in [(640, 360), (1920, 1080)]:
+        folder = make_image_folder(width, height, count)
+        for batch_size in [1, 8]:
+            for mmap_cache in [False, True]:
+                # Walk the folder sequentially like a batch job, so read-ahead applies
+                position = {"index": 0}
+
+                def step():
+                    result = node.load_batch(folder, batch_size, position["index"], 0, 1024, 1024, "bilinear", mmap_cache)
+                    position["index"] = result["result"][2]
+
+                results.append(measure(
+                    "folder_image_source",
+                    {"size": f"{width}x{height}", "batch": batch_size, "mmap_cache": mmap_cache},
+                    step, args.repeat, items=batch_size,
+                ))
+    return results
+
+def _jpeg_bytes(width, height):
+    array = np.random.RandomState(SEED).randint(0, 255, (height, width, 3), dtype=np.uint8)
+    buffer = BytesIO()
+    Image.fromarray(array).save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+class StubHTTPServer:
+    """Serves fixed thumbnails, oEmbed and Unsplash search responses on localhost."""
+
+    def __init__(self):
+        jpeg = _jpeg_bytes(1280, 720)
+        photo = _jpeg_bytes(800, 1200)
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split("?", 1)[0]
+                if path.startswith("/vi/") or path == "/image.jpg":
+                    self._send(jpeg, "image/jpeg")
+                elif path == "/photo.jpg":
+                    self._send(photo, "image/jpeg")
+                elif path == "/oembed":
+                    self._send(json.dumps({"title": "Benchmark Video"}).encode(), "application/json")
+                elif path == "/search/photos":
+                    results = [{"urls": {"raw": f"{server.url}/photo.jpg?ixid={i}"}} for i in range(30)]
+                    self._send(json.dumps({"results": results}).encode(), "application/json")
+                else:
+                    self.send_error(404)
+
+            def _send(self, body, content_type):
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+def bench_network_nodes(args):
+    youtube = comfy_stubs.load_module("youtube_thumbnail_extractor")
+    random_person = comfy_stubs.load_module("random_person_photo")
+    os.environ.setdefault("UNSPLASH_ACCESS_KEY", "benchmark")
+    results = []
+    with StubHTTPServer() as server:
+        youtube.THUMBNAIL_URL_TEMPLATE = server.url + "/vi/{video_id}/{quality}.jpg"
+        youtube.OEMBED_URL_TEMPLATE = server.url + "/oembed?v={video_id}"
+        random_person.UNSPLASH_SEARCH_URL = server.url + "/search/photos"
+
+        # cache_ttl=0 and seed=-1 bypass the shared prefetch cache, so every
+        # iteration does its HTTP requests like a pre-prefetch baseline did
+        node = youtube.YouTubeThumbnailExtractor()
+        for url in ["https://www.youtube.com/watch?v=dQw4w9WgXcQ", server.url + "/image.jpg"]:
+            results.append(measure(
+                "youtube_thumbnail_extractor", {"url": "youtube" if "youtube" in url else "direct_image"},
+                lambda: node.extract_thumbnail(url, cache_ttl=0), args.repeat,
+            ))
+        node = random_person.RandomPersonPhoto()
+        results.append(measure(
+            "random_person_photo", {"seed": -1},
+            lambda: node.get_random_person(800, 1200, "random", "portrait", -1), args.repeat,
+        ))
+    return results
+
+BENCHMARKS = {
+    "process_image": bench_process_image,
+    "image_size_processor_node": bench_image_size_processor_node,
+    "image_cache": bench_image_cache,
+    "video_thumbnail_extractor": bench_video_thumbnail_extractor,
+    "network_nodes": bench_network_nodes,
+    "folder_image_source": bench_folder_image_source,
+}
+
+def compare(results, baseline_path):
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    by_key = {(r["name"], json.dumps(r["params"], sort_keys=True)): r for r in baseline["results"]}
+    print(f"\nComparison with {baseline_path} (p50, <1.00 is faster):")
+    for result in results:
+        key = (result["name"], json.dumps(result["params"], sort_keys=True))
+        if key in by_key and by_key[key]["p50_s"] > 0:
+            ratio = result["p50_s"] / by_key[key]["p50_s"]
+            print(f"{result['name']:32} {key[1]:60} {ratio:6.2f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", action="append", choices=sorted(BENCHMARKS), help="run only these benchmarks")
+    parser.add_argument("--repeat", type=int, default=10, help="timed iterations per case")
+    parser.add_argument("--quick", action="store_true", help="smaller batch and clip sizes")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="baseline JSON file to compare p50 latencies against")
+    args = parser.parse_args()
+    output = os.path.abspath(args.output) if args.output else None
+    baseline = os.path.abspath(args.compare) if args.compare else None
+
+    np.random.seed(SEED)
+    torch.manual_seed(SEED)
+    # Run node code from inside the scratch directory so nothing lands in the repo
+    os.chdir(BASE_PATH)
+
+    results = []
+    for name in args.only or BENCHMARKS:
+        results.extend(BENCHMARKS[name](args))
+
+    report = {
+        "python": platform.python_version(),
+        "torch": torch.__version__,
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "quick": args.quick,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "results": results,
+    }
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if baseline:
+        compare(results, baseline)
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,18 @@
 import os
-import folder_paths
 import json
+from .lora_catalog import lora_catalog
+from .character_presets import character_presets
 
 class CharacterLoaderNode:
     """
     A node for loading character presets with text and two fixed LORA inputs.
+    A preset from the character preset file can be selected on top of them.
     """
     
     @classmethod
     def INPUT_TYPES(cls):
-        # Get available LORA files
-        lora_files = folder_paths.get_filename_list("loras")
+        # Get available LORA files from the cached catalog instead of walking the folder
+        lora_files = lora_catalog.get_filenames()
         lora_options = ["None"] + lora_files
         
         inputs = {
@@ -23,22 +25,59 @@ class CharacterLoaderNode:
                 "lora_name_2": (lora_options,),
                 "lora_strength_2": ("FLOAT", {"default": 1.0, "min": -2.0, "max": 2.0, "step": 0.01}),
             },
+            "optional": {
+                # Preset text comes before character_text, preset LORAs before the two above
+                "preset": (["None"] + character_presets.get_names(),),
+            },
         }
         
         return inputs
 
+    @classmethod
+    def VALIDATE_INPUTS(cls, lora_name_1, lora_name_2, preset="None"):
+        # Catch missing LORA files before execution rather than in the loader downstream.
+        # Linked inputs arrive as None and are checked when they are resolved.
+        lora_names = [lora_name_1, lora_name_2]
+        if preset not in (None, "None"):
+            character = character_presets.get(preset)
+            if character is None:
+                return f"Character preset not found: {preset}"
+            lora_names.extend(lora[0] for lora in character["loras"])
+        for lora_name in lora_names:
+            if lora_name not in (None, "None") and not lora_catalog.contains(lora_name):
+                return f"LORA file not found: {lora_name}"
+        return True
+
+    @classmethod
+    def IS_CHANGED(cls, preset="None", **kwargs):
+        # Re-run when the selected preset is edited in the preset file
+        if preset == "None":
+            return ""
+        character = character_presets.get(preset)
+        return character["revision"] if character is not None else ""
+
     RETURN_TYPES = ("STRING", "LORA_STACK")
     RETURN_NAMES = ("text_output", "lora_stack_output")
     FUNCTION = "load_character"
     CATEGORY = "Custom Nodes/Character"
 
-    def load_character(self, character_text, enable_text, enable_lora, lora_name_1, lora_strength_1, lora_name_2, lora_strength_2):
+    def load_character(self, character_text, enable_text, enable_lora, lora_name_1, lora_strength_1, lora_name_2, lora_strength_2, preset="None"):
+        character = None
+        if preset != "None":
+            character = character_presets.get(preset)
+            if character is None:
+                raise ValueError(f"Character preset not found: {preset}")
+
         # Handle text output
         text_output = character_text if enable_text else ""
+        if enable_text and character is not None:
+            text_output = ", ".join(t for t in (character["text"], character_text) if t.strip())
         
         # Handle LORA stack output
         lora_stack = []
         if enable_lora:
+            if character is not None:
+                lora_stack.extend(character["loras"])
             if lora_name_1 != "None":
                 lora_stack.append((lora_name_1, lora_strength_1, lora_strength_1))
             if lora_name_2 != "None":
@@ -0,0 +1,153 @@
+import json
+import os
+import threading
+import time
+from .pack_logging import get_logger
+from .user_data import get_user_data_path
+
+logger = get_logger("CharacterPresets")
+
+# Overrides the preset file location, e.g. a path shared by several workers
+PRESETS_FILE_ENV = "CYAN_IMAGE_CHARACTER_PRESETS"
+# Seconds between mtime checks of the preset file
+STALE_CHECK_INTERVAL = 2.0
+
+def _parse_lora(entry):
+    """Accept {"name", "strength", "strength_clip"}, [name, strength] or [name, model, clip]."""
+    if isinstance(entry, dict):
+        strength = float(entry.get("strength", entry.get("strength_model", 1.0)))
+        lora = (entry["name"], strength, float(entry.get("strength_clip", strength)))
+    elif len(entry) == 2:
+        lora = (entry[0], float(entry[1]), float(entry[1]))
+    else:
+        lora = (entry[0], float(entry[1]), float(entry[2]))
+    if not isinstance(lora[0], str):
+        raise TypeError("LoRA name must be a string")
+    return lora
+
+def _check_fields(entry):
+    # Wrong types would otherwise surface later, e.g. as a crash in the node
+    if not isinstance(entry["name"], str):
+        raise TypeError("name must be a string")
+    if not isinstance(entry.get("text", ""), str):
+        raise TypeError("text must be a string")
+    tags = entry.get("tags", [])
+    if not isinstance(tags, list) or not all(isinstance(tag, str) for tag in tags):
+        raise TypeError("tags must be a list of strings")
+    if not isinstance(entry.get("loras", []), list):
+        raise TypeError("loras must be a list")
+
+class CharacterPresetStore:
+    """
+    Character presets (text, tags and any number of LoRAs) kept in one JSON
+    file in the user directory:
+
+        {"presets": [{"name": "Alice", "text": "...", "tags": ["main"],
+                      "loras": [{"name": "alice.safetensors", "strength": 0.8}]}]}
+
+    The file is parsed once into dicts by name and by tag, so lookups are
+    O(1), and reloaded only when its mtime changes. Each preset carries a
+    revision string that changes whenever its content does.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.lock = threading.Lock()
+        self.presets = {}
+        self.tags = {}
+        self.names = []
+        self.mtime = None
+        self.last_check = 0.0
+
+    def get_path(self):
+        return self.path or os.getenv(PRESETS_FILE_ENV) or get_user_data_path("character_presets.json")
+
+    def _load(self, path):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        entries = data.get("presets", []) if isinstance(data, dict) else data
+        if isinstance(entries, dict):
+            entries = [dict(entry, name=name) for name, entry in entries.items()]
+        presets = {}
+        tags = {}
+        for entry in entries:
+            try:
+                name = entry["name"]
+                _check_fields(entry)
+                preset = {
+                    "name": name,
+                    "text": entry.get("text", ""),
+                    "tags": list(entry.get("tags", [])),
+                    "loras": [_parse_lora(lora) for lora in entry.get("loras", [])],
+                }
+            except (KeyError, TypeError, ValueError, IndexError) as e:
+                logger.warning("Skipping invalid preset %r: %s", entry, e)
+                continue
+            if name in presets:
+                logger.warning("Duplicate preset name %s, keeping the last one", name)
+            preset["revision"] = json.dumps([preset["text"], preset["loras"]])
+            presets[name] = preset
+        for preset in presets.values():
+            for tag in preset["tags"]:
+                tags.setdefault(tag, []).append(preset["name"])
+        self.presets = presets
+        self.tags = tags
+        self.names = sorted(presets)
+        logger.info("Loaded %d character presets from %s", len(presets), path)
+
+    def refresh(self, force=False):
+        """Reload the preset file if its mtime changed since the last load."""
+        with self.lock:
+            now = time.monotonic()
+            if not force and now - self.last_check < STALE_CHECK_INTERVAL:
+                return
+            self.last_check = now
+            path = self.get_path()
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                mtime = None
+            if not force and mtime == self.mtime:
+                return
+            self.mtime = mtime
+            if mtime is None:
+                self.presets, self.tags, self.names = {}, {}, []
+                return
+            try:
+                self._load(path)
+            except (OSError, ValueError, TypeError) as e:
+                # Keep serving the previous presets while the file is being edited
+                logger.error("Could not load character presets from %s: %s", path, e)
+
+    def get_names(self):
+        self.refresh()
+        return list(self.names)
+
+    def get(self, name):
+        """Return the preset dict for name, or None."""
+        self.refresh()
+        return self.presets.get(name)
+
+    def get_by_tag(self, tag):
+        self.refresh()
+        presets = self.presets
+        return [presets[name] for name in self.tags.get(tag, []) if name in presets]
+
+character_presets = CharacterPresetStore()
+
+def register_routes(routes):
+    """List presets at /cyan-image/character-presets, optionally filtered with ?tag=."""
+
+    @routes.get("/cyan-image/character-presets")
+    async def get_presets(request):
+        from aiohttp import web
+
+        tag = request.query.get("tag")
+        if tag:
+            presets = character_presets.get_by_tag(tag)
+        else:
+            presets = [character_presets.get(name) for name in character_presets.get_names()]
+        return web.json_response([
+            {"name": p["name"], "tags": p["tags"], "loras": [lora[0] for lora in p["loras"]]}
+            for p in presets if p is not None
+        ])
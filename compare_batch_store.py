@@ -0,0 +1,110 @@
+import threading
+import uuid
+from collections import OrderedDict
+from io import BytesIO
+
+# Total bytes of registered frames kept alive. Older batches are dropped so a
+# long session of previews does not keep every frame in memory; the newest
+# batch is always kept, even when it is larger on its own.
+MAX_STORED_BYTES = 1024 ** 3
+# Number of encoded frames kept per store, so paging back and forth over the
+# prefetch window does not re-encode the same frame.
+MAX_ENCODED_FRAMES = 64
+
+class CompareBatchStore:
+    """
+    Keeps image batches for ImagePreviewCompare in memory and encodes single
+    frames on demand, instead of writing every frame of both batches to disk.
+    Frames are stored as uint8, a quarter of the size of the float32 IMAGE.
+    """
+
+    def __init__(self, max_bytes=MAX_STORED_BYTES, max_encoded=MAX_ENCODED_FRAMES):
+        self.max_bytes = max_bytes
+        self.max_encoded = max_encoded
+        self.batches = OrderedDict()
+        self.stored_bytes = 0
+        self.encoded = OrderedDict()
+        self.lock = threading.Lock()
+
+    def register(self, image_a, image_b):
+        """Register a pair of IMAGE batches and return a lightweight handle dict."""
+        handle = uuid.uuid4().hex
+        sides = {
+            "a": _to_uint8(image_a) if image_a is not None else None,
+            "b": _to_uint8(image_b) if image_b is not None else None,
+        }
+        size = sum(batch.nbytes for batch in sides.values() if batch is not None)
+        with self.lock:
+            self.batches[handle] = (sides, size)
+            self.stored_bytes += size
+            while self.stored_bytes > self.max_bytes and len(self.batches) > 1:
+                old_handle, (_, old_size) = self.batches.popitem(last=False)
+                self.stored_bytes -= old_size
+                for key in [k for k in self.encoded if k[0] == old_handle]:
+                    del self.encoded[key]
+        return {
+            "handle": handle,
+            "count_a": len(sides["a"]) if sides["a"] is not None else 0,
+            "count_b": len(sides["b"]) if sides["b"] is not None else 0,
+        }
+
+    def get_frame(self, handle, side, index):
+        """Return PNG bytes for one frame, or None if the handle/frame is unknown."""
+        key = (handle, side, index)
+        with self.lock:
+            if key in self.encoded:
+                self.encoded.move_to_end(key)
+                return self.encoded[key]
+            entry = self.batches.get(handle)
+            if entry is None or entry[0].get(side) is None:
+                return None
+            batch = entry[0][side]
+            if index < 0 or index >= len(batch):
+                return None
+            frame = batch[index]
+
+        data = self._encode(frame)
+
+        with self.lock:
+            self.encoded[key] = data
+            while len(self.encoded) > self.max_encoded:
+                self.encoded.popitem(last=False)
+        return data
+
+    def _encode(self, frame):
+        from PIL import Image
+
+        buffer = BytesIO()
+        # Low compression keeps encode latency down; these are transient previews.
+        Image.fromarray(frame).save(buffer, format="PNG", compress_level=1)
+        return buffer.getvalue()
+
+def _to_uint8(image):
+    # Same truncation the PNG encode used to apply per frame
+    return (image.detach().cpu() * 255.0).clamp_(0, 255).byte().numpy()
+
+compare_batch_store = CompareBatchStore()
+
+def register_routes(routes):
+    """Register the frame endpoint on the ComfyUI server's route table."""
+    import asyncio
+
+    @routes.get("/cyan-image/compare/{handle}/{side}/{index}")
+    async def get_compare_frame(request):
+        from aiohttp import web
+
+        handle = request.match_info["handle"]
+        side = request.match_info["side"]
+        try:
+            index = int(request.match_info["index"])
+        except ValueError:
+            return web.Response(status=400)
+        if side not in ("a", "b"):
+            return web.Response(status=400)
+
+        # Encoding runs off the event loop so large frames don't stall the server
+        loop = asyncio.get_running_loop()
+        data = await loop.run_in_executor(None, compare_batch_store.get_frame, handle, side, index)
+        if data is None:
+            return web.Response(status=404)
+        return web.Response(body=data, content_type="image/png", headers={"Cache-Control": "private, max-age=3600"})
@@ -0,0 +1,127 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import folder_paths
+from .pack_logging import get_logger
+
+logger = get_logger("DiskWriter")
+
+# Writes waiting in the queue before submit() blocks the caller
+MAX_PENDING_WRITES = 64
+
+def get_save_directory(env_name, default_subfolder):
+    """
+    Directory for images a node keeps, from the given environment variable
+    (absolute, or relative to ComfyUI's input directory) or default_subfolder.
+    """
+    return os.path.join(folder_paths.get_input_directory(), os.getenv(env_name) or default_subfolder)
+
+class BackgroundImageWriter:
+    """
+    Saves PIL images on a background thread through a bounded queue so nodes
+    don't block on disk I/O. Unique file names are reserved up front from an
+    in-memory index of each directory (built with one scandir on first use)
+    plus a per-name counter, instead of probing the disk once per collision.
+    Unique files are created exclusively when written, so a file another
+    process added to the directory is never overwritten.
+    """
+
+    def __init__(self, max_pending=MAX_PENDING_WRITES):
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.lock = threading.Lock()
+        self.names = {}
+        self.counters = {}
+        # Reserved unique path -> requested file name, claimed when written
+        self.unique_paths = {}
+        self.thread = None
+
+    def _known_names(self, directory):
+        names = self.names.get(directory)
+        if names is None:
+            try:
+                names = set(entry.name for entry in os.scandir(directory))
+            except FileNotFoundError:
+                names = set()
+            self.names[directory] = names
+        return names
+
+    def reserve_path(self, directory, filename, unique=True):
+        """
+        Return the path filename will be written to. With unique set, a
+        "_<n>" suffix is added when the name is already taken, and the
+        writer claims the file exclusively so a file that appeared on disk
+        in the meantime is never overwritten.
+        """
+        directory = os.path.abspath(directory)
+        with self.lock:
+            path = os.path.join(directory, self._unique_name(directory, filename) if unique else filename)
+            self._known_names(directory).add(os.path.basename(path))
+            if unique:
+                self.unique_paths[path] = filename
+        return path
+
+    def _unique_name(self, directory, filename):
+        # The index avoids probing every taken name; one stat on the chosen
+        # candidate catches files created since the directory was scanned
+        names = self._known_names(directory)
+        candidate = filename
+        base, ext = os.path.splitext(filename)
+        counter_key = (directory, filename)
+        index = self.counters.get(counter_key, 0)
+        while candidate in names or os.path.exists(os.path.join(directory, candidate)):
+            names.add(candidate)
+            index += 1
+            candidate = f"{base}_{index}{ext}"
+        self.counters[counter_key] = index
+        return candidate
+
+    def _claim(self, path):
+        """Create path exclusively, moving on to the next free name if it exists."""
+        with self.lock:
+            filename = self.unique_paths.pop(path, None)
+        if filename is None:
+            return path
+        directory = os.path.dirname(path)
+        while True:
+            try:
+                os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644))
+                return path
+            except FileExistsError:
+                with self.lock:
+                    path = os.path.join(directory, self._unique_name(directory, filename))
+                logger.warning("File appeared before saving, writing to %s instead", path)
+
+    def submit(self, image, path):
+        """Queue a PIL image to be saved at path; blocks while the queue is full."""
+        self._ensure_thread()
+        self.queue.put((image, path))
+
+    def flush(self):
+        """Wait until every queued image has been written."""
+        if self.thread is not None:
+            self.queue.join()
+
+    def _ensure_thread(self):
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="cyan-image-disk-writer", daemon=True)
+                self.thread.start()
+
+    def _run(self):
+        while True:
+            image, path = self.queue.get()
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                path = self._claim(path)
+                image.save(path)
+                logger.debug("Image saved to: %s", path)
+            except Exception as e:
+                logger.rate_limited(logging.ERROR, "write_failed", 10, "Failed to save %s: %s", path, e)
+            finally:
+                self.queue.task_done()
+
+image_writer = BackgroundImageWriter()
+# Don't lose queued images when ComfyUI shuts down
+atexit.register(image_writer.flush)
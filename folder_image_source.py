@@ -0,0 +1,322 @@
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+import numpy as np
+import torch
+from PIL import Image, ImageOps
+import folder_paths
+from .pack_logging import get_logger
+from .instrumentation import start_execution, attach
+
+logger = get_logger("FolderImageSource")
+
+# Register image folders, relative folder inputs are resolved against these
+image_extensions = ['.png', '.jpg', '.jpeg', '.webp', '.bmp', '.tif', '.tiff']
+folder_paths.add_model_folder_path("image_folders", os.path.join(folder_paths.base_path, "image_folders"))
+
+RESIZE_METHODS = {
+    "lanczos": Image.Resampling.LANCZOS,
+    "bicubic": Image.Resampling.BICUBIC,
+    "bilinear": Image.Resampling.BILINEAR,
+    "nearest": Image.Resampling.NEAREST,
+}
+# Decoding releases the GIL, so a few threads keep up with downstream nodes
+MAX_DECODE_WORKERS = min(8, os.cpu_count() or 1)
+# Decoded bytes waiting to be picked up (read-ahead); the oldest decodes
+# beyond this are dropped and cancelled
+MAX_PENDING_BYTES = 512 * 1024 ** 2
+# Upper bound for one memory-mapped cache file
+MAX_MMAP_BYTES = int(float(os.getenv("CYAN_IMAGE_FOLDER_CACHE_MAX_GB", "8")) * 1024 ** 3)
+# Memory-mapped caches kept open at once; older ones are closed and deleted
+MAX_MMAP_CACHES = 4
+
+def resolve_folder(folder):
+    """Absolute folder as is, otherwise the first registered image folder containing it."""
+    if os.path.isabs(folder):
+        return folder
+    roots = folder_paths.get_folder_paths("image_folders")
+    for root in roots:
+        candidate = os.path.join(root, folder)
+        if os.path.isdir(candidate):
+            return candidate
+    return os.path.join(roots[0], folder)
+
+class FolderIndex:
+    """
+    Sorted image files of each folder, rebuilt with a single scandir only
+    when the folder's mtime changes. Entries are (path, mtime_ns, size).
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.folders = {}
+
+    def get(self, folder):
+        """Return (folder mtime_ns, entries) for folder."""
+        try:
+            mtime = os.stat(folder).st_mtime_ns
+        except OSError:
+            raise ValueError(f"Could not find image folder: {folder}")
+        with self.lock:
+            cached = self.folders.get(folder)
+            if cached is not None and cached[0] == mtime:
+                return cached
+        entries = []
+        for entry in os.scandir(folder):
+            if entry.is_file() and os.path.splitext(entry.name)[1].lower() in image_extensions:
+                stat = entry.stat()
+                entries.append((entry.path, stat.st_mtime_ns, stat.st_size))
+        entries.sort()
+        logger.debug("Indexed %d images in %s", len(entries), folder)
+        with self.lock:
+            self.folders[folder] = (mtime, entries)
+        return mtime, entries
+
+    def refresh_entries(self, entries, indices):
+        """
+        Re-stat the files at indices and update entries in place for files
+        edited without changing the folder's mtime. Returns the changed indices.
+        """
+        changed = []
+        for index in set(indices):
+            path, mtime, size = entries[index]
+            try:
+                stat = os.stat(path)
+            except OSError:
+                # Removal changes the folder's mtime, the next get() reindexes
+                continue
+            if (stat.st_mtime_ns, stat.st_size) != (mtime, size):
+                entries[index] = (path, stat.st_mtime_ns, stat.st_size)
+                changed.append(index)
+        return changed
+
+def _decoded_bytes(size):
+    return size[0] * size[1] * 3
+
+def decode_image(path, size, resample):
+    """Decode path to an RGB uint8 array, cover-cropped to size when given."""
+    with Image.open(path) as image:
+        image = ImageOps.exif_transpose(image).convert("RGB")
+        if size is not None and image.size != size:
+            image = ImageOps.fit(image, size, resample)
+        return np.asarray(image, dtype=np.uint8)
+
+class MmapImageCache:
+    """
+    Decoded images of one folder at one size, stored in a memory-mapped
+    uint8 file under ComfyUI's temp directory. Repeated passes over a large
+    folder then skip decoding without holding the pixels in Python memory.
+    """
+
+    def __init__(self, path, count, size):
+        width, height = size
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.array = np.memmap(path, dtype=np.uint8, mode="w+", shape=(count, height, width, 3))
+        # Index entry (path, mtime_ns, size) each slot was decoded from, None while empty
+        self.sources = [None] * count
+
+    def has(self, index, entry):
+        return self.sources[index] == entry
+
+    def close(self):
+        del self.array
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+class FolderImageLoader:
+    """
+    Decodes images on a bounded thread pool. After each batch the next one
+    is submitted as read-ahead, so sequential batch jobs find it decoded.
+    """
+
+    def __init__(self, max_workers=MAX_DECODE_WORKERS):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="cyan-image-decode")
+        self.lock = threading.Lock()
+        # (entry, size, resample) -> future of the decoded array
+        self.pending = OrderedDict()
+        self.pending_bytes = 0
+        self.caches = OrderedDict()
+
+    def _submit(self, entry, size, resample):
+        key = (entry, size, resample)
+        with self.lock:
+            future = self.pending.get(key)
+            if future is None:
+                future = self.pending[key] = self.executor.submit(decode_image, entry[0], size, resample)
+                self.pending_bytes += _decoded_bytes(size)
+                # Always keep the newest decode, even when it is larger on its own
+                while self.pending_bytes > MAX_PENDING_BYTES and len(self.pending) > 1:
+                    old_key, old_future = self.pending.popitem(last=False)
+                    self.pending_bytes -= _decoded_bytes(old_key[1])
+                    old_future.cancel()
+        return key, future
+
+    def _take(self, entry, size, resample):
+        key, future = self._submit(entry, size, resample)
+        try:
+            return future.result()
+        except CancelledError:
+            # Dropped by another execution's read-ahead before it started
+            return decode_image(entry[0], size, resample)
+        finally:
+            with self.lock:
+                if self.pending.get(key) is future:
+                    del self.pending[key]
+                    self.pending_bytes -= _decoded_bytes(size)
+
+    def get_cache(self, folder, mtime, entries, size):
+        width, height = size
+        if len(entries) * width * height * 3 > MAX_MMAP_BYTES:
+            logger.rate_limited(logging.WARNING, "mmap_too_large", 60,
+                                "Skipping memory-mapped cache for %s, it would exceed CYAN_IMAGE_FOLDER_CACHE_MAX_GB", folder)
+            return None
+        key = (folder, mtime, len(entries), size)
+        with self.lock:
+            cache = self.caches.get(key)
+            if cache is None:
+                name = hashlib.sha1(repr(key).encode("utf-8")).hexdigest() + ".u8"
+                path = os.path.join(folder_paths.get_temp_directory(), "cyan-image", name)
+                cache = self.caches[key] = MmapImageCache(path, len(entries), size)
+                while len(self.caches) > MAX_MMAP_CACHES:
+                    self.caches.popitem(last=False)[1].close()
+            else:
+                self.caches.move_to_end(key)
+        return cache
+
+    def load_batch(self, entries, indices, size, resample, cache=None, metrics=None):
+        """Return a uint8 array [len(indices), H, W, 3] of the given entries."""
+        # Decodes and cached slots are keyed on (path, mtime, size), so edited files are decoded again
+        folder_index.refresh_entries(entries, indices)
+        batch = np.empty((len(indices), size[1], size[0], 3), dtype=np.uint8)
+        missing = []
+        for position, index in enumerate(indices):
+            if cache is not None and cache.has(index, entries[index]):
+                batch[position] = cache.array[index]
+            else:
+                missing.append((position, index))
+                self._submit(entries[index], size, resample)
+        if metrics is not None:
+            metrics.count("cache_hits", len(indices) - len(missing))
+            metrics.count("decoded", len(missing))
+        for position, index in missing:
+            batch[position] = self._take(entries[index], size, resample)
+            if cache is not None:
+                cache.array[index] = batch[position]
+                cache.sources[index] = entries[index]
+        return batch
+
+    def read_ahead(self, entries, indices, size, resample, cache=None):
+        for index in indices:
+            if cache is None or not cache.has(index, entries[index]):
+                self._submit(entries[index], size, resample)
+
+folder_index = FolderIndex()
+folder_loader = FolderImageLoader()
+
+def batch_indices(start_index, batch_index, batch_size, total):
+    # Batches always have batch_size images, wrapping around the end of the folder
+    first = start_index + batch_index * batch_size
+    return [(first + i) % total for i in range(batch_size)]
+
+class FolderImageSource:
+    """
+    Loads fixed-size batches of images from a local folder, e.g. extracted
+    video frames, resized to one common size for ImageSizeProcessorNode.
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                # Absolute path or a subfolder of ComfyUI's image_folders directory
+                "folder": ("STRING", {"default": "", "multiline": False}),
+                "batch_size": ("INT", {"default": 4, "min": 1, "max": 256, "step": 1}),
+                "start_index": ("INT", {"default": 0, "min": 0, "step": 1}),
+                # Set to increment to load the next batch on every queue
+                "batch_index": ("INT", {"default": 0, "min": 0, "step": 1, "control_after_generate": True}),
+                # 0 uses the size of the first image in the folder
+                "width": ("INT", {"default": 0, "min": 0, "max": 8192, "step": 8}),
+                "height": ("INT", {"default": 0, "min": 0, "max": 8192, "step": 8}),
+                "resize_method": (list(RESIZE_METHODS), {"default": "lanczos"}),
+            },
+            "optional": {
+                "mmap_cache": ("BOOLEAN", {"default": False, "label_on": "Cache On", "label_off": "Cache Off"}),
+            }
+        }
+
+    @classmethod
+    def IS_CHANGED(cls, folder, batch_size=4, start_index=0, batch_index=0, **kwargs):
+        # Re-run when files are added or removed, or a file of this batch is edited in place.
+        # Linked inputs arrive as None: a linked folder can't be checked at all, and
+        # without the batch position only the folder itself is keyed.
+        if folder is None:
+            return float("nan")
+        path = resolve_folder(folder)
+        try:
+            mtime, entries = folder_index.get(path)
+        except ValueError:
+            return f"{path}:missing"
+        if not entries or None in (batch_size, start_index, batch_index):
+            return f"{path}:{mtime}"
+        indices = batch_indices(start_index, batch_index, batch_size, len(entries))
+        folder_index.refresh_entries(entries, indices)
+        return f"{path}:{mtime}:" + ",".join(f"{entries[i][1]}/{entries[i][2]}" for i in indices)
+
+    RETURN_TYPES = ("IMAGE", "STRING", "INT", "INT")
+    RETURN_NAMES = ("images", "filenames", "next_index", "total")
+    FUNCTION = "load_batch"
+    CATEGORY = "cyan-image"
+    BACKGROUND_COLOR = "#00FFFF"  # Cyan color
+
+    def load_batch(self, folder, batch_size, start_index, batch_index, width, height, resize_method, mmap_cache=False):
+        metrics = start_execution("FolderImageSource")
+        path = resolve_folder(folder)
+        with metrics.span("index"):
+            mtime, entries = folder_index.get(path)
+        if not entries:
+            raise ValueError(f"No images found in folder: {path}")
+        total = len(entries)
+
+        if width and height:
+            size = (width, height)
+        else:
+            # Header read only, the pixels are decoded with the batch
+            with Image.open(entries[0][0]) as first:
+                first_size = first.size
+                # EXIF orientations 5-8 are rotated by 90 degrees on decode
+                if first.getexif().get(0x0112, 1) in (5, 6, 7, 8):
+                    first_size = first_size[::-1]
+            size = (width or first_size[0], height or first_size[1])
+        resample = RESIZE_METHODS.get(resize_method, Image.Resampling.LANCZOS)
+
+        indices = batch_indices(start_index, batch_index, batch_size, total)
+        start_index = indices[0]
+        next_index = (start_index + batch_size) % total
+        cache = folder_loader.get_cache(path, mtime, entries, size) if mmap_cache else None
+
+        with metrics.span("decode"):
+            batch = folder_loader.load_batch(entries, indices, size, resample, cache, metrics)
+        folder_loader.read_ahead(entries, [(next_index + i) % total for i in range(batch_size)], size, resample, cache)
+
+        with metrics.span("to_tensor"):
+            images = torch.from_numpy(batch).float().div_(255.0)
+        metrics.track_tensor(images)
+        logger.info("Loaded %d images (%dx%d) from %s starting at %d of %d", batch_size, size[0], size[1], path, start_index, total)
+
+        filenames = "\n".join(os.path.basename(entries[i][0]) for i in indices)
+        return {"ui": attach({}, metrics.finish()), "result": (images, filenames, next_index, total)}
+
+# Register the node
+NODE_CLASS_MAPPINGS = {
+    "FolderImageSource": FolderImageSource
+}
+
+NODE_DISPLAY_NAME_MAPPINGS = {
+    "FolderImageSource": "Folder Image Source"
+}
@@ -1,17 +1,18 @@
 from nodes import PreviewImage
 import folder_paths
+from .compare_batch_store import compare_batch_store
+from .instrumentation import start_execution, attach
+from .pack_logging import get_logger
 
-print("[ImagePreviewCompare] Loading node module")
+logger = get_logger("ImagePreviewCompare")
 
 class ImagePreviewCompare(PreviewImage):
     def __init__(self):
-        print("[ImagePreviewCompare] Initializing node")
         super().__init__()
         self.mode = "overlay"
     
     @classmethod
     def INPUT_TYPES(s):
-        print("[ImagePreviewCompare] Getting input types")
         return {
             "required": {
                 "image1": ("IMAGE",),
@@ -29,38 +30,31 @@ class ImagePreviewCompare(PreviewImage):
     WEB_DIRECTORY = "./web/comfyui"
     
     def preview_compare(self, image1, image2, mode="overlay", opacity=0.5, split_position=0.5, split_line_color="white", split_line_glow=0.0, filename_prefix="preview_compare", prompt=None, extra_pnginfo=None):
-        print(f"[ImagePreviewCompare] Starting preview_compare with mode: {mode}")
-        print(f"[ImagePreviewCompare] Image1 shape: {image1.shape if image1 is not None else None}")
-        print(f"[ImagePreviewCompare] Image2 shape: {image2.shape if image2 is not None else None}")
+        logger.debug("Starting preview_compare with mode: %s", mode)
+        logger.debug("Image1 shape: %s, Image2 shape: %s",
+                     image1.shape if image1 is not None else None,
+                     image2.shape if image2 is not None else None)
+        
+        metrics = start_execution("ImagePreviewCompare")
         
         # Update state
         self.mode = mode
         
-        # Initialize result with empty images array
-        result = {
-            "images": []
-        }
-        
-        # Save first image
-        if image1 is not None and len(image1) > 0:
-            print("[ImagePreviewCompare] Saving image1")
-            image1_result = self.save_images(image1, filename_prefix + "_1", prompt, extra_pnginfo)
-            print(f"[ImagePreviewCompare] Image1 save result: {image1_result}")
-            if 'ui' in image1_result and 'images' in image1_result['ui']:
-                result['images'].extend(image1_result['ui']['images'])
+        # Register both batches once; the widget pulls only the frames it shows
+        # (plus a small prefetch window) through the compare route.
+        has_image1 = image1 is not None and len(image1) > 0
+        has_image2 = image2 is not None and len(image2) > 0
+        with metrics.span("register"):
+            batch = compare_batch_store.register(image1 if has_image1 else None, image2 if has_image2 else None)
+        for image in (image1, image2):
+            if image is not None:
+                metrics.track_tensor(image)
+        batch["mode"] = mode
+        logger.info("Registered batch %s (%d vs %d frames)", batch["handle"], batch["count_a"], batch["count_b"])
         
-        # Save second image
-        if image2 is not None and len(image2) > 0:
-            print("[ImagePreviewCompare] Saving image2")
-            image2_result = self.save_images(image2, filename_prefix + "_2", prompt, extra_pnginfo)
-            print(f"[ImagePreviewCompare] Image2 save result: {image2_result}")
-            if 'ui' in image2_result and 'images' in image2_result['ui']:
-                result['images'].extend(image2_result['ui']['images'])
-        
-        print(f"[ImagePreviewCompare] Final result: {result}")
-        return result
+        ui = attach({"compare_batch": [batch]}, metrics.finish())
+        return {"ui": ui, "result": (image1,)}
 
-print("[ImagePreviewCompare] Registering node class")
 # Register the node
 NODE_CLASS_MAPPINGS = {
     "ImagePreviewCompare": ImagePreviewCompare
@@ -69,5 +63,3 @@ NODE_CLASS_MAPPINGS = {
 NODE_DISPLAY_NAME_MAPPINGS = {
     "ImagePreviewCompare": "Image Preview Compare"
 }
-
-print("[ImagePreviewCompare] Node registration complete") 
\ No newline at end of file
@@ -2,9 +2,12 @@ import torch
 import numpy as np
 from PIL import Image
 import hashlib
+import re
+import time
+from .pack_logging import get_logger
+from .instrumentation import NULL_METRICS, start_execution, increment, attach
 
-def log_message(message):
-    print(f"[ImageSizeProcessor] {message}")
+logger = get_logger("ImageSizeProcessor")
 
 # Cache for upscaled images
 class ImageCache:
@@ -26,8 +29,10 @@ class ImageCache:
         key = self.get_key(image, scale_factor)
         if key in self.cache:
             self.access_count[key] += 1
-            log_message(f"Cache hit for image with scale {scale_factor}")
+            increment("ImageSizeProcessor", "cache_hits")
+            logger.debug("Cache hit for image with scale %s", scale_factor)
             return self.cache[key]
+        increment("ImageSizeProcessor", "cache_misses")
         return None
     
     def put(self, image, scale_factor, processed_image):
@@ -41,7 +46,7 @@ class ImageCache:
         
         self.cache[key] = processed_image
         self.access_count[key] = 1
-        log_message(f"Cached image with scale {scale_factor}")
+        logger.debug("Cached image with scale %s", scale_factor)
 
 # Initialize global cache
 image_cache = ImageCache()
@@ -83,59 +88,75 @@ ASPECT_RATIO_RANGES = {
     "square": (0.8, 1.2)       # Height/Width between 0.8 and 1.2
 }
 
-def get_dimension_from_aspect_ratio(width, height):
-    aspect_ratio = height / width
-    
-    # Determine orientation
-    if ASPECT_RATIO_RANGES["portrait"][0] <= aspect_ratio <= ASPECT_RATIO_RANGES["portrait"][1]:
-        # Portrait
-        if width <= 512:
-            return "SD 1.x - Portrait (512x768)"
-        elif width <= 1024:
-            return "SDXL - Portrait (1024x1536)"
-        elif width <= 1536:
-            return "High Res - Portrait (1536x2304)"
-        else:
-            return "High Res - Portrait (2048x3072)"
-    elif ASPECT_RATIO_RANGES["landscape"][0] <= aspect_ratio <= ASPECT_RATIO_RANGES["landscape"][1]:
-        # Landscape
-        if width <= 512:
-            return "SD 1.x - Landscape (768x512)"
-        elif width <= 1024:
-            return "SDXL - Landscape (1536x1024)"
-        elif width <= 1536:
-            return "High Res - Landscape (2304x1536)"
-        else:
-            return "High Res - Landscape (3072x2048)"
-    else:
-        # Square
-        if width <= 512:
-            return "SD 1.x - Square (512x512)"
-        elif width <= 768:
-            return "SD 2.x - Square (768x768)"
-        elif width <= 1024:
-            return "SDXL - Square (1024x1024)"
-        elif width <= 1536:
-            return "High Res - Square (1536x1536)"
+def _parse_dimensions(label):
+    """Extract (width, height) from an SD_DIMENSIONS label such as "SDXL - Square (1024x1024)"."""
+    match = re.search(r"\((\d+)x(\d+)\)", label)
+    return int(match.group(1)), int(match.group(2))
+
+class ResolutionBucketIndex:
+    """
+    Model resolutions indexed by pixel budget and aspect ratio, built once
+    from SD_DIMENSIONS. Every budget gets the named resolutions plus a ladder
+    of multiple-of-64 buckets that stay within the budget, so any aspect ratio
+    maps to a valid size. Lookups are vectorized over a whole batch.
+    """
+
+    def __init__(self, dimensions, step=64, max_aspect=4.0):
+        self.labels = list(dimensions.keys())
+        label_sizes = np.array([_parse_dimensions(label) for label in self.labels])
+        self.label_widths = label_sizes[:, 0]
+        self.label_heights = label_sizes[:, 1]
+        self.label_log_aspect = np.log(self.label_heights / self.label_widths)
+
+        self.budgets = np.array(sorted(set(dimensions.values())))
+        self.buckets = {}
+        for budget in self.budgets:
+            sizes = set(
+                (w, h) for w, h in zip(self.label_widths, self.label_heights) if w * h == budget
+            )
+            side = np.sqrt(budget)
+            for width in range(step, int(side * np.sqrt(max_aspect)) + step, step):
+                height = int(budget / width) // step * step
+                if height >= step and max(width / height, height / width) <= max_aspect:
+                    sizes.add((width, height))
+            sizes = np.array(sorted(sizes, key=lambda wh: np.log(wh[1] / wh[0])))
+            self.buckets[int(budget)] = (sizes[:, 0], sizes[:, 1], np.log(sizes[:, 1] / sizes[:, 0]))
+
+    def nearest_budget(self, pixels):
+        return int(self.budgets[np.abs(self.budgets - pixels).argmin()])
+
+    def lookup(self, budget, widths, heights):
+        """
+        Return arrays (bucket_widths, bucket_heights) with the bucket nearest in
+        aspect ratio for each (width, height) pair, within the given pixel budget.
+        """
+        bucket_widths, bucket_heights, bucket_log_aspect = self.buckets[self.nearest_budget(budget)]
+        log_aspect = np.log(np.asarray(heights, dtype=np.float64) / np.asarray(widths, dtype=np.float64))
+        right = np.clip(np.searchsorted(bucket_log_aspect, log_aspect), 1, len(bucket_log_aspect) - 1)
+        left = right - 1
+        choose_left = np.abs(log_aspect - bucket_log_aspect[left]) <= np.abs(bucket_log_aspect[right] - log_aspect)
+        index = np.where(choose_left, left, right)
+        return bucket_widths[index], bucket_heights[index]
+
+    def nearest_label(self, width, height):
+        """
+        SD_DIMENSIONS label closest in aspect ratio, preferring the smallest one
+        that holds at least width*height pixels.
+        """
+        distance = np.abs(self.label_log_aspect - np.log(height / width))
+        candidates = np.flatnonzero(distance <= distance.min() + 1e-6)
+        pixels = self.label_widths[candidates] * self.label_heights[candidates]
+        large_enough = candidates[pixels >= width * height]
+        if len(large_enough):
+            best = large_enough[(self.label_widths[large_enough] * self.label_heights[large_enough]).argmin()]
         else:
-            return "High Res - Square (2048x2048)"
+            best = candidates[pixels.argmax()]
+        return self.labels[best]
 
-def get_2m_pixel_dimensions(width, height):
-    """Calculate dimensions for approximately 2 million pixels while maintaining aspect ratio"""
-    target_pixels = 2000000  # 2 million pixels
-    aspect_ratio = height / width
-    
-    # Calculate new dimensions
-    new_width = int(np.sqrt(target_pixels / aspect_ratio))
-    new_height = int(target_pixels / new_width)
-    
-    # Ensure we're as close to 2M pixels as possible
-    actual_pixels = new_width * new_height
-    if actual_pixels < target_pixels:
-        # Try to get closer by adjusting height
-        new_height = int(target_pixels / new_width)
-    
-    return new_width, new_height
+bucket_index = ResolutionBucketIndex(SD_DIMENSIONS)
+
+def get_dimension_from_aspect_ratio(width, height):
+    return bucket_index.nearest_label(width, height)
 
 def get_400k_pixel_dimensions(width, height):
     """Calculate dimensions for approximately 400k pixels while maintaining aspect ratio"""
@@ -159,17 +180,18 @@ class ImageSizeProcessor:
         self.max_pixels = SD_DIMENSIONS["High Res - Square (1536x1536)"]  # Default to SDXL square
         self.min_pixels = SD_DIMENSIONS["SD 2.x - Square (768x768)"]  # Default minimum size
     
-    def process_image(self, image, upscale_model=None, resize_method="lanczos", scale_factor=2.0):
+    def process_image(self, image, upscale_model=None, resize_method="lanczos", scale_factor=2.0, metrics=NULL_METRICS):
         # Convert to PIL Image if it's not already
         if isinstance(image, torch.Tensor):
-            image = Image.fromarray((image.cpu().numpy() * 255).astype(np.uint8))
+            with metrics.span("decode"):
+                image = Image.fromarray((image.cpu().numpy() * 255).astype(np.uint8))
         
         # Calculate total pixels
         width, height = image.size
         total_pixels = width * height
         
-        log_message(f"Input image size: {width}x{height} (total pixels: {total_pixels})")
-        log_message(f"Max pixels: {self.max_pixels}, Min pixels: {self.min_pixels}")
+        logger.debug("Input image size: %dx%d (total pixels: %d)", width, height, total_pixels)
+        logger.debug("Max pixels: %d, Min pixels: %d", self.max_pixels, self.min_pixels)
         
         # Process based on size
         if total_pixels > self.max_pixels:
@@ -177,21 +199,23 @@ class ImageSizeProcessor:
             scale_factor = np.sqrt(self.max_pixels / total_pixels)
             new_width = int(width * scale_factor)
             new_height = int(height * scale_factor)
-            log_message(f"Downscaling image to {new_width}x{new_height} (scale factor: {scale_factor})")
-            image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+            logger.debug("Downscaling image to %dx%d (scale factor: %s)", new_width, new_height, scale_factor)
+            with metrics.span("resize"):
+                image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
         elif total_pixels < self.min_pixels:
             # Upscale
             if upscale_model is not None:
                 # Use upscaler model
-                log_message(f"Using upscaler model for scaling")
+                logger.debug("Using upscaler model for scaling")
                 # Convert to tensor for upscaling
                 img_tensor = torch.from_numpy(np.array(image)).float() / 255.0
                 img_tensor = img_tensor.permute(2, 0, 1).unsqueeze(0)
                 
-                log_message(f"Upscaling image with provided upscaler...")
+                logger.debug("Upscaling image with provided upscaler...")
                 # Upscale using the model
-                with torch.no_grad():
+                with metrics.span("upscale"), torch.no_grad():
                     upscaled = upscale_model(img_tensor)
+                metrics.track_tensor(upscaled)
                 
                 # Convert back to PIL
                 upscaled = upscaled.squeeze(0).permute(1, 2, 0).cpu().numpy()
@@ -203,18 +227,54 @@ class ImageSizeProcessor:
                     final_scale = scale_factor / 4.0
                     new_width = int(image.width * final_scale)
                     new_height = int(image.height * final_scale)
-                    log_message(f"Additional scaling to {new_width}x{new_height} (scale factor: {final_scale})")
-                    image = image.resize((new_width, new_height), self._get_resize_method(resize_method))
+                    logger.debug("Additional scaling to %dx%d (scale factor: %s)", new_width, new_height, final_scale)
+                    with metrics.span("resize"):
+                        image = image.resize((new_width, new_height), self._get_resize_method(resize_method))
             else:
                 # Simple resize without upscaler
                 new_width = int(width * scale_factor)
                 new_height = int(height * scale_factor)
-                log_message(f"Simple resize to {new_width}x{new_height} using {resize_method} method (scale factor: {scale_factor})")
-                image = image.resize((new_width, new_height), self._get_resize_method(resize_method))
+                logger.debug("Simple resize to %dx%d using %s method (scale factor: %s)", new_width, new_height, resize_method, scale_factor)
+                with metrics.span("resize"):
+                    image = image.resize((new_width, new_height), self._get_resize_method(resize_method))
         else:
-            log_message("Image is within size limits, no processing needed")
+            logger.debug("Image is within size limits, no processing needed")
+        
+        logger.debug("Final image size: %s", image.size)
+        return image
+    
+    def process_to_size(self, image, target_size, upscale_model=None, resize_method="lanczos", metrics=NULL_METRICS):
+        """Resize an image to exactly target_size (width, height) in one resampling step."""
+        if isinstance(image, torch.Tensor):
+            with metrics.span("decode"):
+                image = Image.fromarray((image.cpu().numpy() * 255).astype(np.uint8))
         
-        log_message(f"Final image size: {image.size}")
+        target_width, target_height = target_size
+        if image.size == (target_width, target_height):
+            return image
+        
+        # Let the upscaler provide the detail when the bucket is bigger than the
+        # source; its output is then brought to the exact bucket size below.
+        if upscale_model is not None and image.width * image.height < target_width * target_height:
+            logger.debug("Upscaling image with provided upscaler before fitting to bucket")
+            img_tensor = torch.from_numpy(np.array(image)).float() / 255.0
+            img_tensor = img_tensor.permute(2, 0, 1).unsqueeze(0)
+            with metrics.span("upscale"), torch.no_grad():
+                upscaled = upscale_model(img_tensor)
+            metrics.track_tensor(upscaled)
+            upscaled = upscaled.squeeze(0).permute(1, 2, 0).cpu().numpy()
+            image = Image.fromarray(np.clip(upscaled * 255, 0, 255).astype(np.uint8))
+        
+        with metrics.span("resize"):
+            # Cover-crop: scale to fill the bucket, then center-crop the small
+            # aspect-ratio difference, all in a single resample
+            scale = max(target_width / image.width, target_height / image.height)
+            crop_width = target_width / scale
+            crop_height = target_height / scale
+            left = (image.width - crop_width) / 2
+            top = (image.height - crop_height) / 2
+            image = image.resize((target_width, target_height), self._get_resize_method(resize_method),
+                                 box=(left, top, left + crop_width, top + crop_height))
         return image
     
     def _get_resize_method(self, method):
@@ -250,7 +310,9 @@ class ImageSizeProcessorNode:
     BACKGROUND_COLOR = "#00FFFF"  # Cyan color
     
     def process(self, image, max_dimension, min_dimension, upscale_model, auto_select, use_upscaler, resize_method, scale_factor):
-        log_message(f"Processing batch of {len(image)} images")
+        start_time = time.perf_counter()
+        metrics = start_execution("ImageSizeProcessor")
+        metrics.track_tensor(image)
         processor = ImageSizeProcessor()
         
         # Set dimensions
@@ -260,43 +322,54 @@ class ImageSizeProcessorNode:
         # Process each image in the batch
         processed_images = []
         small_images = []
+        if auto_select:
+            # One lookup for the whole batch; each image is then resized straight
+            # to its bucket instead of going through an intermediate resize.
+            batch_size, height, width = image.shape[0], image.shape[1], image.shape[2]
+            with metrics.span("auto_select"):
+                bucket_widths, bucket_heights = bucket_index.lookup(
+                    processor.max_pixels, [width] * batch_size, [height] * batch_size)
         for i, img in enumerate(image):
+            logger.debug("Processing image %d/%d", i + 1, len(image))
             if auto_select:
-                # Convert to PIL Image to get dimensions
-                if isinstance(img, torch.Tensor):
-                    pil_img = Image.fromarray((img.cpu().numpy() * 255).astype(np.uint8))
-                    width, height = pil_img.size
-                    new_width, new_height = get_2m_pixel_dimensions(width, height)
-                    log_message(f"Auto-select: Resizing to {new_width}x{new_height} (target: ~2M pixels) using fast resize")
-                    img = pil_img.resize((new_width, new_height), Image.Resampling.NEAREST)  # Fast resize method
-                else:
-                    # If it's already a PIL Image
-                    width, height = img.size
-                    new_width, new_height = get_2m_pixel_dimensions(width, height)
-                    log_message(f"Auto-select: Resizing to {new_width}x{new_height} (target: ~2M pixels) using fast resize")
-                    img = img.resize((new_width, new_height), Image.Resampling.NEAREST)  # Fast resize method
-            
-            log_message(f"Processing image {i+1}/{len(image)}")
-            processed = processor.process_image(img, upscale_model if use_upscaler else None, resize_method, scale_factor)
-            processed_images.append(np.array(processed))
-            
-            # Create small version (~400k pixels)
-            if isinstance(processed, torch.Tensor):
-                pil_processed = Image.fromarray((processed.cpu().numpy() * 255).astype(np.uint8))
+                target_size = (int(bucket_widths[i]), int(bucket_heights[i]))
+                logger.debug("Auto-select: Resizing %dx%d to bucket %dx%d", width, height, *target_size)
+                processed = processor.process_to_size(img, target_size, upscale_model if use_upscaler else None, resize_method, metrics)
             else:
-                pil_processed = processed
-            
-            width, height = pil_processed.size
-            small_width, small_height = get_400k_pixel_dimensions(width, height)
-            log_message(f"Creating small version: {small_width}x{small_height} (target: ~400k pixels)")
-            small_img = pil_processed.resize((small_width, small_height), Image.Resampling.NEAREST)
-            small_images.append(np.array(small_img))
+                processed = processor.process_image(img, upscale_model if use_upscaler else None, resize_method, scale_factor, metrics)
+            processed_images.append(np.array(processed))
+            small_images.append(self._make_small(processed, metrics))
         
         # Convert to tensors
-        processed_tensor = torch.from_numpy(np.stack(processed_images)).float() / 255.0
-        small_tensor = torch.from_numpy(np.stack(small_images)).float() / 255.0
+        with metrics.span("stack"):
+            processed_tensor = torch.from_numpy(np.stack(processed_images)).float() / 255.0
+            small_tensor = torch.from_numpy(np.stack(small_images)).float() / 255.0
+        metrics.track_tensor(processed_tensor)
+        metrics.count("bytes_in", image.nelement() * image.element_size())
+        metrics.count("bytes_out", processed_tensor.nelement() * processed_tensor.element_size()
+                      + small_tensor.nelement() * small_tensor.element_size())
         
-        return (processed_tensor, small_tensor)
+        # One summary line per batch; per-image detail is available at DEBUG
+        logger.info("Processed %d images to %dx%d (small %dx%d) in %.2fs",
+                    len(image), processed_tensor.shape[2], processed_tensor.shape[1],
+                    small_tensor.shape[2], small_tensor.shape[1], time.perf_counter() - start_time)
+        
+        ui = attach({}, metrics.finish())
+        return {"ui": ui, "result": (processed_tensor, small_tensor)}
+
+    def _make_small(self, processed, metrics):
+        """Create the small version (~400k pixels) of a processed image as a uint8 array."""
+        if isinstance(processed, torch.Tensor):
+            pil_processed = Image.fromarray((processed.cpu().numpy() * 255).astype(np.uint8))
+        else:
+            pil_processed = processed
+        
+        width, height = pil_processed.size
+        small_width, small_height = get_400k_pixel_dimensions(width, height)
+        logger.debug("Creating small version: %dx%d (target: ~400k pixels)", small_width, small_height)
+        with metrics.span("small"):
+            small_img = pil_processed.resize((small_width, small_height), Image.Resampling.NEAREST)
+        return np.array(small_img)
 
 # Register the node
 NODE_CLASS_MAPPINGS = {
@@ -0,0 +1,220 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from .pack_logging import get_logger
+
+logger = get_logger("Instrumentation")
+
+# CYAN_IMAGE_METRICS=0 turns spans and counters into no-ops
+ENABLED = os.getenv("CYAN_IMAGE_METRICS", "1").lower() not in ("0", "false", "off")
+# When set, every execution summary is appended to this file as one JSON line
+METRICS_FILE = os.getenv("CYAN_IMAGE_METRICS_FILE", "")
+
+_totals_lock = threading.Lock()
+# (node, stage) -> [count, seconds]
+_stage_totals = {}
+# (node, counter) -> value
+_counter_totals = {}
+_file_lock = threading.Lock()
+
+class StageRecorder:
+    """
+    Per-stage wall time and counters without an owning execution, e.g. for
+    network work done on a background thread that is merged into the node's
+    ExecutionMetrics later.
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self.counters = {}
+
+    @contextmanager
+    def span(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(stage, time.perf_counter() - start)
+
+    def add_time(self, stage, seconds):
+        entry = self.stages.setdefault(stage, [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+
+    def count(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def merge(self, other):
+        for stage, (n, seconds) in other.stages.items():
+            entry = self.stages.setdefault(stage, [0, 0.0])
+            entry[0] += n
+            entry[1] += seconds
+        for name, value in other.counters.items():
+            self.count(name, value)
+
+class ExecutionMetrics(StageRecorder):
+    """
+    Collects per-stage wall time, counters (bytes moved, cache hits, ...) and
+    the size of the largest tracked tensor for one node execution.
+
+        metrics = ExecutionMetrics("ImageSizeProcessor")
+        with metrics.span("resize"):
+            ...
+        metrics.count("bytes_in", len(data))
+        summary = metrics.finish()
+    """
+
+    def __init__(self, node_name):
+        super().__init__()
+        self.node_name = node_name
+        self.start = time.perf_counter()
+        self.largest_tensor_bytes = 0
+        self.cuda = _cuda_if_initialized()
+        # The CUDA peak counter is process-wide, so read it instead of resetting it
+        if self.cuda is not None:
+            self.cuda_start = (self.cuda.memory_allocated(), self.cuda.max_memory_allocated())
+
+    def track_tensor(self, tensor):
+        """Record a tensor's size; the summary reports the largest one tracked."""
+        size = tensor.nelement() * tensor.element_size()
+        if size > self.largest_tensor_bytes:
+            self.largest_tensor_bytes = size
+
+    def finish(self):
+        """Build the summary dict, add it to the process totals and export it."""
+        summary = {
+            "node": self.node_name,
+            "timestamp": time.time(),
+            "wall_s": round(time.perf_counter() - self.start, 6),
+            "stages": {name: {"count": n, "s": round(s, 6)} for name, (n, s) in self.stages.items()},
+            "counters": dict(self.counters),
+            "largest_tensor_bytes": self.largest_tensor_bytes,
+        }
+        if self.cuda is not None:
+            allocated, peak = self.cuda_start
+            summary["cuda_allocated_delta_bytes"] = self.cuda.memory_allocated() - allocated
+            # Only non-zero when this execution pushed the process peak higher
+            summary["cuda_peak_increase_bytes"] = self.cuda.max_memory_allocated() - peak
+
+        with _totals_lock:
+            for name, (n, s) in self.stages.items():
+                entry = _stage_totals.setdefault((self.node_name, name), [0, 0.0])
+                entry[0] += n
+                entry[1] += s
+            for name, value in self.counters.items():
+                key = (self.node_name, name)
+                _counter_totals[key] = _counter_totals.get(key, 0) + value
+
+        if METRICS_FILE:
+            _append_json_line(summary)
+        logger.debug("%s finished in %.3fs", self.node_name, summary["wall_s"])
+        return summary
+
+class _NullMetrics:
+    """Stand-in used when instrumentation is disabled."""
+
+    node_name = None
+
+    @contextmanager
+    def span(self, stage):
+        yield
+
+    def add_time(self, stage, seconds):
+        pass
+
+    def count(self, name, value=1):
+        pass
+
+    def track_tensor(self, tensor):
+        pass
+
+    def merge(self, other):
+        pass
+
+    def finish(self):
+        return None
+
+NULL_METRICS = _NullMetrics()
+
+def start_execution(node_name):
+    """Return a metrics collector for one execution of node_name."""
+    return ExecutionMetrics(node_name) if ENABLED else NULL_METRICS
+
+def increment(node_name, name, value=1):
+    """Add to a process-wide counter outside of a single execution (e.g. a shared cache)."""
+    if not ENABLED:
+        return
+    with _totals_lock:
+        key = (node_name, name)
+        _counter_totals[key] = _counter_totals.get(key, 0) + value
+
+def attach(ui, summary):
+    """Add an execution summary to a node's UI output dict."""
+    if summary is not None:
+        ui["metrics"] = [summary]
+    return ui
+
+def timed_get(metrics, url, **kwargs):
+    """
+    requests.get that records "request" (time to response headers) and
+    "download" (body transfer) spans plus bytes_in on the given metrics.
+    """
+    import requests
+
+    start = time.perf_counter()
+    response = requests.get(url, stream=True, **kwargs)
+    metrics.add_time("request", response.elapsed.total_seconds())
+    content = response.content
+    metrics.add_time("download", time.perf_counter() - start - response.elapsed.total_seconds())
+    metrics.count("bytes_in", len(content))
+    return response
+
+def render_prometheus():
+    """Render the process totals in the Prometheus text exposition format."""
+    lines = [
+        "# HELP cyan_image_stage_seconds_total Wall time spent per node stage.",
+        "# TYPE cyan_image_stage_seconds_total counter",
+    ]
+    with _totals_lock:
+        stage_totals = sorted(_stage_totals.items())
+        counter_totals = sorted(_counter_totals.items())
+    for (node, stage), (n, seconds) in stage_totals:
+        lines.append(f'cyan_image_stage_seconds_total{{node="{node}",stage="{stage}"}} {seconds}')
+    lines.append("# HELP cyan_image_stage_calls_total Number of times a node stage ran.")
+    lines.append("# TYPE cyan_image_stage_calls_total counter")
+    for (node, stage), (n, seconds) in stage_totals:
+        lines.append(f'cyan_image_stage_calls_total{{node="{node}",stage="{stage}"}} {n}')
+    lines.append("# HELP cyan_image_counter_total Node counters such as bytes moved and cache hits.")
+    lines.append("# TYPE cyan_image_counter_total counter")
+    for (node, name), value in counter_totals:
+        lines.append(f'cyan_image_counter_total{{node="{node}",name="{name}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+def register_routes(routes):
+    """Expose the totals at /cyan-image/metrics for Prometheus scraping."""
+
+    @routes.get("/cyan-image/metrics")
+    async def get_metrics(request):
+        from aiohttp import web
+
+        return web.Response(text=render_prometheus(), content_type="text/plain", charset="utf-8")
+
+def _append_json_line(summary):
+    try:
+        with _file_lock, open(METRICS_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps(summary) + "\n")
+    except OSError as e:
+        logger.rate_limited(logging.WARNING, "metrics_file", 60, "Could not write metrics file %s: %s", METRICS_FILE, e)
+
+def _cuda_if_initialized():
+    # Don't initialize CUDA just to measure it; only read stats if it's in use
+    try:
+        import torch
+    except ImportError:
+        return None
+    if torch.cuda.is_available() and torch.cuda.is_initialized():
+        return torch.cuda
+    return None
@@ -1,5 +1,44 @@
+MERGE_MODES = ["concat", "sum", "max", "last"]
+
+def merge_lora_stacks(stacks, mode="concat"):
+    """
+    Merge LORA_STACK lists of (lora_name, model_strength, clip_strength).
+
+    "concat" keeps every entry as-is. The other modes keep one entry per LoRA
+    name, combining strengths by sum, keeping the whole entry with the largest
+    model strength magnitude ("max", the first one on ties) or the last
+    occurrence ("last"), drop entries whose strengths are both zero and sort
+    by name so the same set of LoRAs always produces the same stack.
+    """
+    if mode == "concat":
+        merged = []
+        for stack in stacks:
+            merged.extend(stack)
+        return merged
+
+    combined = {}
+    for stack in stacks:
+        for lora_name, model_strength, clip_strength in stack:
+            if lora_name not in combined or mode == "last":
+                combined[lora_name] = (model_strength, clip_strength)
+                continue
+            prev_model, prev_clip = combined[lora_name]
+            if mode == "sum":
+                combined[lora_name] = (prev_model + model_strength, prev_clip + clip_strength)
+            elif mode == "max":
+                if abs(model_strength) > abs(prev_model):
+                    combined[lora_name] = (model_strength, clip_strength)
+            else:
+                raise ValueError(f"Unknown merge mode: {mode}")
+
+    return [
+        (lora_name, model_strength, clip_strength)
+        for lora_name, (model_strength, clip_strength) in sorted(combined.items())
+        if model_strength != 0 or clip_strength != 0
+    ]
+
 class LoraAndTextCombinerNode:
-    MAX_PAIRS = 3
+    MAX_PAIRS = 10
 
     @classmethod
     def INPUT_TYPES(cls):
@@ -7,8 +46,9 @@ class LoraAndTextCombinerNode:
         optional_inputs = {}
         for i in range(1, cls.MAX_PAIRS + 1):
             optional_inputs[f"toggle_{i}"] = ("BOOLEAN", {"default": True, "label_on": "Enabled", "label_off": "Disabled"})
-            optional_inputs[f"text_{i}"] = ("STRING", {"forceInput": True})
-            optional_inputs[f"lora_stack_{i}"] = ("LORA_STACK",)
+            optional_inputs[f"text_{i}"] = ("STRING", {"forceInput": True, "lazy": True})
+            optional_inputs[f"lora_stack_{i}"] = ("LORA_STACK", {"lazy": True})
+        optional_inputs["merge_mode"] = (MERGE_MODES, {"default": "concat"})
 
         return {
             "required": required_inputs,
@@ -20,9 +60,20 @@ class LoraAndTextCombinerNode:
     FUNCTION = "combine"
     CATEGORY = "Custom Nodes/Combiners"
 
-    def combine(self, **kwargs):
+    def check_lazy_status(self, **kwargs):
+        # Skip evaluating text/lora branches of pairs that are toggled off
+        needed = []
+        for i in range(1, self.MAX_PAIRS + 1):
+            if not kwargs.get(f"toggle_{i}", True):
+                continue
+            for name in (f"text_{i}", f"lora_stack_{i}"):
+                if name in kwargs and kwargs[name] is None:
+                    needed.append(name)
+        return needed
+
+    def combine(self, merge_mode="concat", **kwargs):
         texts = []
-        final_lora_stack = []
+        lora_stacks = []
 
         for i in range(1, self.MAX_PAIRS + 1):
             # Check if the toggle for this pair is enabled
@@ -32,12 +83,13 @@ class LoraAndTextCombinerNode:
                 if text:
                     texts.append(str(text))
 
-                # Extend LORA stack if it exists
+                # Collect LORA stack if it exists
                 lora_stack = kwargs.get(f"lora_stack_{i}")
                 if lora_stack:
-                    final_lora_stack.extend(lora_stack)
+                    lora_stacks.append(lora_stack)
 
         combined_text = ", ".join(texts)
+        final_lora_stack = merge_lora_stacks(lora_stacks, merge_mode)
         return (combined_text, final_lora_stack if final_lora_stack else None,)
 
 NODE_CLASS_MAPPINGS = {
@@ -45,4 +97,4 @@ NODE_CLASS_MAPPINGS = {
 }
 NODE_DISPLAY_NAME_MAPPINGS = {
     "LoraAndTextCombiner": "Lora and Text Combiner"
-} 
\ No newline at end of file
+}
@@ -0,0 +1,213 @@
+import asyncio
+import json
+import os
+import struct
+import threading
+import time
+import folder_paths
+from .pack_logging import get_logger
+from .user_data import get_user_data_path
+
+logger = get_logger("LoraCatalog")
+
+# Seconds between staleness checks; repeated object_info requests within this
+# window are served from memory without touching the (possibly remote) disk.
+STALE_CHECK_INTERVAL = 5.0
+# Upper bound for a safetensors JSON header, anything larger is treated as corrupt
+MAX_HEADER_BYTES = 100 * 1024 * 1024
+INDEX_VERSION = 1
+
+class LoraCatalog:
+    """
+    In-memory index of the files in a model folder (LoRAs by default).
+
+    The index remembers the mtime of every directory it walked and only walks
+    again once one of them changes, so listing a large network-mounted library
+    costs a handful of stat calls. The index can be persisted so a fresh
+    process can skip the first walk too. Safetensors header metadata is read
+    lazily per file and cached by mtime.
+    """
+
+    def __init__(self, folder_name="loras", index_path=None, persist=True):
+        self.folder_name = folder_name
+        self.index_path = index_path
+        self.persist = persist
+        self.lock = threading.Lock()
+        self.roots = []
+        self.dir_mtimes = {}
+        self.files = {}
+        self.filenames = []
+        self.metadata = {}
+        self.last_check = 0.0
+        self.loaded = False
+
+    def _get_roots(self):
+        return [os.path.abspath(p) for p in folder_paths.get_folder_paths(self.folder_name)]
+
+    def _get_extensions(self):
+        entry = folder_paths.folder_names_and_paths.get(self.folder_name)
+        extensions = entry[1] if entry and entry[1] else folder_paths.supported_pt_extensions
+        return set(ext.lower() for ext in extensions)
+
+    def _is_stale(self, roots):
+        if roots != self.roots:
+            return True
+        for directory, mtime in self.dir_mtimes.items():
+            try:
+                if os.stat(directory).st_mtime_ns != mtime:
+                    return True
+            except OSError:
+                return True
+        # Roots that did not exist at scan time may have been created since
+        return any(root not in self.dir_mtimes and os.path.isdir(root) for root in roots)
+
+    def _scan(self, roots):
+        extensions = self._get_extensions()
+        dir_mtimes = {}
+        files = {}
+        for root in roots:
+            if not os.path.isdir(root):
+                continue
+            for directory, subdirs, filenames in os.walk(root, followlinks=True):
+                try:
+                    dir_mtimes[directory] = os.stat(directory).st_mtime_ns
+                except OSError:
+                    continue
+                for filename in filenames:
+                    if os.path.splitext(filename)[1].lower() not in extensions:
+                        continue
+                    full_path = os.path.join(directory, filename)
+                    relative = os.path.relpath(full_path, root)
+                    # Earlier roots win, matching folder_paths.get_full_path
+                    files.setdefault(relative, full_path)
+        self.roots = roots
+        self.dir_mtimes = dir_mtimes
+        self.files = files
+        self.filenames = sorted(files)
+
+    def _load_index(self, roots):
+        path = self.index_path or get_user_data_path("lora_catalog.json")
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if data.get("version") != INDEX_VERSION or data.get("roots") != roots:
+            return False
+        self.roots = roots
+        self.dir_mtimes = data.get("dir_mtimes", {})
+        self.files = data.get("files", {})
+        self.filenames = sorted(self.files)
+        return not self._is_stale(roots)
+
+    def _save_index(self):
+        path = self.index_path or get_user_data_path("lora_catalog.json")
+        data = {
+            "version": INDEX_VERSION,
+            "roots": self.roots,
+            "dir_mtimes": self.dir_mtimes,
+            "files": self.files,
+        }
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("Could not persist catalog index: %s", e)
+
+    def refresh(self, force=False):
+        """Rescan if the folder changed since the last scan (or always when force is set)."""
+        with self.lock:
+            now = time.monotonic()
+            if not force and self.loaded and now - self.last_check < STALE_CHECK_INTERVAL:
+                return
+            self.last_check = now
+            roots = self._get_roots()
+            if not self.loaded:
+                self.loaded = True
+                if not force and self.persist and self._load_index(roots):
+                    return
+            elif not force and not self._is_stale(roots):
+                return
+            self._scan(roots)
+            if self.persist:
+                self._save_index()
+
+    def get_filenames(self):
+        """Sorted list of file names relative to their folder root, as used in dropdowns."""
+        self.refresh()
+        return list(self.filenames)
+
+    def contains(self, name):
+        self.refresh()
+        return name in self.files
+
+    def get_full_path(self, name):
+        self.refresh()
+        return self.files.get(name)
+
+    def get_metadata(self, name):
+        """
+        Return a dict with "base_model" and "trigger_words" for a safetensors
+        file, read from its JSON header only. Other formats return an empty dict.
+        """
+        full_path = self.get_full_path(name)
+        if full_path is None or not full_path.lower().endswith(".safetensors"):
+            return {}
+        try:
+            mtime = os.stat(full_path).st_mtime_ns
+        except OSError:
+            return {}
+        cached = self.metadata.get(name)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        metadata = self._read_safetensors_metadata(full_path)
+        self.metadata[name] = (mtime, metadata)
+        return metadata
+
+    def _read_safetensors_metadata(self, full_path):
+        try:
+            with open(full_path, "rb") as f:
+                header_size = struct.unpack("<Q", f.read(8))[0]
+                if header_size > MAX_HEADER_BYTES:
+                    return {}
+                header = json.loads(f.read(header_size))
+        except (OSError, ValueError, struct.error) as e:
+            logger.warning("Could not read header of %s: %s", full_path, e)
+            return {}
+
+        raw = header.get("__metadata__") or {}
+        base_model = raw.get("ss_base_model_version") or raw.get("modelspec.architecture")
+        trigger_words = []
+        if raw.get("modelspec.trigger_phrase"):
+            trigger_words = [w.strip() for w in raw["modelspec.trigger_phrase"].split(",") if w.strip()]
+        elif raw.get("ss_tag_frequency"):
+            # kohya stores {dataset: {tag: count}}; the most frequent tags act as triggers
+            try:
+                frequencies = {}
+                for tags in json.loads(raw["ss_tag_frequency"]).values():
+                    for tag, count in tags.items():
+                        frequencies[tag.strip()] = frequencies.get(tag.strip(), 0) + count
+                trigger_words = sorted(frequencies, key=frequencies.get, reverse=True)[:5]
+            except (ValueError, AttributeError):
+                pass
+        return {"base_model": base_model, "trigger_words": trigger_words}
+
+lora_catalog = LoraCatalog()
+
+def register_routes(routes):
+    """Serve base model and trigger words of a LoRA at /cyan-image/loras/metadata?name=."""
+
+    @routes.get("/cyan-image/loras/metadata")
+    async def get_lora_metadata(request):
+        from aiohttp import web
+
+        name = request.query.get("name")
+        if not name or not lora_catalog.contains(name):
+            return web.Response(status=404)
+        # Reads the file header, keep it off the event loop
+        loop = asyncio.get_running_loop()
+        metadata = await loop.run_in_executor(None, lora_catalog.get_metadata, name)
+        return web.json_response(dict(metadata, name=name))
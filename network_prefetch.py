@@ -0,0 +1,137 @@
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from .pack_logging import get_logger
+
+logger = get_logger("NetworkPrefetch")
+
+# Concurrent prefetches; network-bound, so a few threads are plenty
+MAX_WORKERS = 4
+# Completed results kept for reuse by shared keys
+MAX_CACHED_KEYS = 32
+# Untaken fetches kept per non-shared key, e.g. for prompts queued back to back
+MAX_PENDING_PER_KEY = 4
+# Seconds a non-shared fetch waits to be taken before it is dropped, e.g. when
+# the prompt failed validation or was cancelled before the node ran
+PENDING_MAX_AGE = 600
+
+class NetworkPrefetcher:
+    """
+    Runs network fetches for nodes on a thread pool as soon as a prompt is
+    submitted, so only decoding is left for the execution thread.
+
+    A "shared" key (e.g. a URL) keeps one result that every execution with
+    the same key reuses. A non-shared key queues one fetch per request and
+    each execution takes its own, for nodes that must return something new
+    every time (e.g. a random photo). Non-shared fetches nobody takes are
+    capped per key and expire after PENDING_MAX_AGE seconds.
+    """
+
+    def __init__(self, max_workers=MAX_WORKERS, max_cached=MAX_CACHED_KEYS,
+                 max_pending=MAX_PENDING_PER_KEY, max_age=PENDING_MAX_AGE):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="cyan-image-prefetch")
+        self.max_cached = max_cached
+        self.max_pending = max_pending
+        self.max_age = max_age
+        # key -> deque of (expiry time or None for shared results, future)
+        self.futures = OrderedDict()
+        self.lock = threading.Lock()
+
+    def prefetch(self, key, fn, *args, shared=True):
+        """Start fn(*args) in the background unless a shared result for key already exists."""
+        with self.lock:
+            self._expire()
+            pending = self.futures.get(key)
+            if pending is not None and shared:
+                self.futures.move_to_end(key)
+                return
+            if pending is None:
+                pending = self.futures[key] = deque()
+            elif len(pending) >= self.max_pending:
+                logger.debug("Not prefetching %s, %d fetches are already waiting", key, len(pending))
+                return
+            expiry = None if shared else time.monotonic() + self.max_age
+            pending.append((expiry, self.executor.submit(fn, *args)))
+            self._evict()
+        logger.debug("Prefetching %s", key)
+
+    def get(self, key, fn, *args, shared=True):
+        """
+        Return the result for key, waiting on a prefetch if one was started or
+        running fn(*args) on the calling thread otherwise. Failed fetches are
+        dropped so the next call retries.
+        """
+        with self.lock:
+            self._expire()
+            pending = self.futures.get(key)
+            entry = None
+            if pending:
+                entry = pending[0] if shared else pending.popleft()
+                if not pending:
+                    del self.futures[key]
+        if entry is None:
+            result = fn(*args)
+            if shared:
+                with self.lock:
+                    self.futures[key] = deque([(None, _completed(result))])
+                    self._evict()
+            return result
+        try:
+            return entry[1].result()
+        except Exception:
+            with self.lock:
+                pending = self.futures.get(key)
+                if pending is not None and entry in pending:
+                    pending.remove(entry)
+                    if not pending:
+                        del self.futures[key]
+            raise
+
+    def _expire(self):
+        now = time.monotonic()
+        for key in list(self.futures):
+            pending = self.futures[key]
+            # Entries are queued in order, so expired ones are at the front
+            while pending and pending[0][0] is not None and pending[0][0] <= now:
+                pending.popleft()[1].cancel()
+            if not pending:
+                del self.futures[key]
+
+    def _evict(self):
+        while len(self.futures) > self.max_cached:
+            self.futures.popitem(last=False)
+
+def _completed(result):
+    future = Future()
+    future.set_result(result)
+    return future
+
+network_prefetcher = NetworkPrefetcher()
+# For requests a prefetch issues alongside its main one. Kept separate from the
+# prefetch pool so a prefetch waiting on these can never starve it.
+io_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="cyan-image-io")
+
+def make_prompt_handler(resolve_class):
+    """
+    Build an on-prompt handler for PromptServer.add_on_prompt_handler that
+    calls the classmethod prefetch(inputs) of every node class defining one.
+    Only literal inputs are passed; linked inputs are unknown at this point,
+    so prefetch must skip nodes whose key inputs are missing from inputs.
+    """
+
+    def on_prompt(json_data):
+        for node in json_data.get("prompt", {}).values():
+            node_cls = resolve_class(node.get("class_type"))
+            prefetch = getattr(node_cls, "prefetch", None) if node_cls is not None else None
+            if prefetch is None:
+                continue
+            inputs = {name: value for name, value in node.get("inputs", {}).items() if not isinstance(value, list)}
+            try:
+                prefetch(inputs)
+            except Exception as e:
+                # Never fail prompt submission because of a prefetch
+                logger.warning("Prefetch for %s failed to start: %s", node.get("class_type"), e)
+        return json_data
+
+    return on_prompt
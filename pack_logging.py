@@ -0,0 +1,92 @@
+import logging
+import os
+import threading
+import time
+
+LOGGER_NAME = "cyan_image"
+# Pack-wide level, e.g. CYAN_IMAGE_LOG_LEVEL=DEBUG for per-frame detail
+LEVEL_ENV = "CYAN_IMAGE_LOG_LEVEL"
+# Per-node override, e.g. CYAN_IMAGE_LOG_LEVEL_IMAGESIZEPROCESSOR=WARNING
+NODE_LEVEL_ENV_PREFIX = "CYAN_IMAGE_LOG_LEVEL_"
+DEFAULT_LEVEL = "INFO"
+
+_loggers = {}
+_loggers_lock = threading.Lock()
+
+def _parse_level(value, default):
+    if not value:
+        return default
+    if value.isdigit():
+        return int(value)
+    level = logging.getLevelName(value.upper())
+    return level if isinstance(level, int) else default
+
+class NodeLogger:
+    """
+    Thin wrapper around a logging.Logger that prefixes messages with the node
+    name the way the pack's old print calls did. Messages use %-style args so
+    nothing is formatted unless the level is enabled.
+    """
+
+    def __init__(self, node_name):
+        self.node_name = node_name
+        self.logger = logging.getLogger(f"{LOGGER_NAME}.{node_name}")
+        env_level = os.getenv(NODE_LEVEL_ENV_PREFIX + node_name.upper())
+        if env_level:
+            self.logger.setLevel(_parse_level(env_level, logging.NOTSET))
+        self.last_emitted = {}
+        self.suppressed = {}
+
+    def set_level(self, level):
+        self.logger.setLevel(_parse_level(level, logging.NOTSET) if isinstance(level, str) else level)
+
+    def is_enabled(self, level):
+        return self.logger.isEnabledFor(level)
+
+    def log(self, level, message, *args):
+        if self.logger.isEnabledFor(level):
+            self.logger.log(level, "[%s] " + message, self.node_name, *args)
+
+    def debug(self, message, *args):
+        self.log(logging.DEBUG, message, *args)
+
+    def info(self, message, *args):
+        self.log(logging.INFO, message, *args)
+
+    def warning(self, message, *args):
+        self.log(logging.WARNING, message, *args)
+
+    def error(self, message, *args):
+        self.log(logging.ERROR, message, *args)
+
+    def rate_limited(self, level, key, interval, message, *args):
+        """
+        Log at most once per interval seconds for the given key. The next
+        message that gets through reports how many were dropped in between.
+        """
+        if not self.logger.isEnabledFor(level):
+            return
+        now = time.monotonic()
+        last = self.last_emitted.get(key)
+        if last is not None and now - last < interval:
+            self.suppressed[key] = self.suppressed.get(key, 0) + 1
+            return
+        self.last_emitted[key] = now
+        dropped = self.suppressed.pop(key, 0)
+        if dropped:
+            message += " (%d similar messages suppressed)"
+            args = args + (dropped,)
+        self.log(level, message, *args)
+
+def get_logger(node_name):
+    """Return the shared NodeLogger for a node name."""
+    with _loggers_lock:
+        if node_name not in _loggers:
+            _loggers[node_name] = NodeLogger(node_name)
+        return _loggers[node_name]
+
+def _configure_pack_logger():
+    pack_logger = logging.getLogger(LOGGER_NAME)
+    pack_logger.setLevel(_parse_level(os.getenv(LEVEL_ENV), logging.getLevelName(DEFAULT_LEVEL)))
+
+_configure_pack_logger()
@@ -1,10 +1,20 @@
-import requests
+import logging
 import torch
 import numpy as np
 from PIL import Image
 from io import BytesIO
 from nodes import PreviewImage
 import os
+from .pack_logging import get_logger
+from .instrumentation import StageRecorder, start_execution, attach, timed_get
+from .network_prefetch import network_prefetcher
+
+logger = get_logger("RandomPersonPhoto")
+
+# Module constant so it can be pointed at a local server (see benchmarks/)
+UNSPLASH_SEARCH_URL = "https://api.unsplash.com/search/photos"
+# Inputs that make up the prefetch key, in get_random_person's argument order
+PREFETCH_INPUTS = ("width", "height", "gender", "query", "seed")
 
 class RandomPersonPhoto(PreviewImage):
     def __init__(self):
@@ -12,10 +22,10 @@ class RandomPersonPhoto(PreviewImage):
         # Get API key from environment variable
         self.api_key = os.getenv("UNSPLASH_ACCESS_KEY", "")
         if not self.api_key:
-            print("[RandomPersonPhoto] Warning: No UNSPLASH_ACCESS_KEY found in environment variables")
-            print("[RandomPersonPhoto] Please set UNSPLASH_ACCESS_KEY to use this node")
-            print("[RandomPersonPhoto] You can get a free Access Key from https://unsplash.com/developers")
-            print("[RandomPersonPhoto] Note: Use the Access Key (Client ID), not the Secret Key")
+            # Nodes are instantiated per execution, so only warn once in a while
+            logger.rate_limited(logging.WARNING, "no_api_key", 3600,
+                                "No UNSPLASH_ACCESS_KEY found in environment variables. "
+                                "Get a free Access Key (Client ID, not the Secret Key) from https://unsplash.com/developers")
 
     @classmethod
     def INPUT_TYPES(cls):
@@ -29,6 +39,24 @@ class RandomPersonPhoto(PreviewImage):
             }
         }
 
+    @classmethod
+    def IS_CHANGED(cls, seed=-1, **kwargs):
+        # seed=-1 asks for a new photo on every queue; any other seed is cacheable
+        if seed == -1:
+            return float("nan")
+        return seed
+
+    @classmethod
+    def prefetch(cls, inputs):
+        """Start the Unsplash search and download as soon as the prompt is queued."""
+        api_key = os.getenv("UNSPLASH_ACCESS_KEY", "")
+        # A linked input isn't known yet, and guessing it would prefetch a photo nobody takes
+        if not api_key or any(name not in inputs for name in PREFETCH_INPUTS):
+            return
+        args = tuple(inputs[name] for name in PREFETCH_INPUTS)
+        # seed=-1 needs a fresh photo per execution, so those fetches aren't shared
+        network_prefetcher.prefetch(("RandomPersonPhoto",) + args, cls._fetch, api_key, *args, shared=args[-1] != -1)
+
     RETURN_TYPES = ("IMAGE",)
     RETURN_NAMES = ("image",)
     FUNCTION = "get_random_person"
@@ -37,28 +65,58 @@ class RandomPersonPhoto(PreviewImage):
     BACKGROUND_COLOR = "#00FFFF"  # Cyan color
 
     def get_random_person(self, width=800, height=1200, gender="random", query="portrait", seed=-1, filename_prefix="random_person", prompt=None, extra_pnginfo=None):
-        print(f"[RandomPersonPhoto] Fetching random person photo ({width}x{height}, gender: {gender})")
+        logger.debug("Fetching random person photo (%dx%d, gender: %s)", width, height, gender)
+        metrics = start_execution("RandomPersonPhoto")
         
         if not self.api_key:
             raise ValueError("No Unsplash Access Key found. Please set UNSPLASH_ACCESS_KEY environment variable.")
         
+        # Wait for the prefetch started when the prompt was queued, or fetch now
+        args = (width, height, gender, query, seed)
+        with metrics.span("wait"):
+            fetched = network_prefetcher.get(("RandomPersonPhoto",) + args, self._fetch, self.api_key, *args, shared=seed != -1)
+        network = fetched.pop("network", None)
+        if network is not None:
+            metrics.merge(network)
+        else:
+            metrics.count("cache_hits")
+        
+        # Convert image to tensor for ComfyUI
+        with metrics.span("decode"):
+            image = Image.open(BytesIO(fetched["content"])).convert("RGB")
+            image_np = np.array(image).astype(np.float32) / 255.0
+            image_tensor = torch.from_numpy(image_np).unsqueeze(0)  # Shape: [1, height, width, channels]
+        metrics.track_tensor(image_tensor)
+        logger.debug("Image tensor shape: %s", image_tensor.shape)
+        
+        # Use PreviewImage's save_images method for UI display
+        with metrics.span("preview"):
+            result = self.save_images(image_tensor, filename_prefix, prompt, extra_pnginfo)
+        logger.info("Fetched %dx%d photo for query: %s", image.width, image.height, fetched["search_query"])
+        
+        # Return both tensor for downstream nodes and UI result for display
+        ui = attach(result.get("ui", {"images": []}), metrics.finish())
+        return {"ui": ui, "result": (image_tensor,)}
+
+    @classmethod
+    def _fetch(cls, api_key, width, height, gender, query, seed):
+        """Search Unsplash and download the chosen photo; runs on a background thread when prefetched."""
+        network = StageRecorder()
+        
         # Construct search query based on gender
         search_query = query
         if gender != "random":
             search_query = f"{query} {gender}"
         
-        # Handle seed for reproducible results
-        if seed == -1:
-            page = np.random.randint(1, 10)  # Random page between 1-10
-        else:
-            np.random.seed(seed)
-            page = np.random.randint(1, 10)
-            np.random.seed(None)
+        # Handle seed for reproducible results; a local generator keeps both the
+        # page and the photo choice tied to the seed without touching global state
+        rng = np.random.RandomState(None if seed == -1 else seed)
+        page = rng.randint(1, 10)  # Random page between 1-10
         
         # Search for photos
-        search_url = "https://api.unsplash.com/search/photos"
+        search_url = UNSPLASH_SEARCH_URL
         headers = {
-            "Authorization": f"Client-ID {self.api_key}",
+            "Authorization": f"Client-ID {api_key}",
             "Accept-Version": "v1"
         }
         params = {
@@ -68,8 +126,8 @@ class RandomPersonPhoto(PreviewImage):
             "orientation": "portrait"
         }
         
-        print(f"[RandomPersonPhoto] Searching Unsplash with query: {search_query}")
-        response = requests.get(search_url, headers=headers, params=params)
+        logger.debug("Searching Unsplash with query: %s", search_query)
+        response = timed_get(network, search_url, headers=headers, params=params, timeout=10)
         
         if response.status_code != 200:
             raise ValueError(f"Failed to search photos. Status code: {response.status_code}")
@@ -79,31 +137,20 @@ class RandomPersonPhoto(PreviewImage):
             raise ValueError("No photos found for the given query")
         
         # Select a random photo from results
-        photo = np.random.choice(data["results"])
+        photo = data["results"][rng.randint(len(data["results"]))]
         photo_url = photo["urls"]["raw"]
         
         # Add size parameters to URL
         photo_url = f"{photo_url}&w={width}&h={height}&fit=crop"
         
-        print(f"[RandomPersonPhoto] Fetching photo from URL: {photo_url}")
+        logger.debug("Fetching photo from URL: %s", photo_url)
         
         # Download the image
-        response = requests.get(photo_url, timeout=10)
+        response = timed_get(network, photo_url, timeout=10)
         if response.status_code != 200:
             raise ValueError(f"Failed to download image. Status code: {response.status_code}")
         
-        # Convert image to tensor for ComfyUI
-        image = Image.open(BytesIO(response.content)).convert("RGB")
-        image_np = np.array(image).astype(np.float32) / 255.0
-        image_tensor = torch.from_numpy(image_np).unsqueeze(0)  # Shape: [1, height, width, channels]
-        print(f"[RandomPersonPhoto] Image tensor shape: {image_tensor.shape}")
-        
-        # Use PreviewImage's save_images method for UI display
-        result = self.save_images(image_tensor, filename_prefix, prompt, extra_pnginfo)
-        print(f"[RandomPersonPhoto] Image saved and processed with PreviewImage")
-        
-        # Return both tensor for downstream nodes and UI result for display
-        return {"ui": result.get("ui", {"images": []}), "result": (image_tensor,)}
+        return {"content": response.content, "search_query": search_query, "network": network}
 
 # Register the node
 NODE_CLASS_MAPPINGS = {
@@ -112,6 +159,4 @@ NODE_CLASS_MAPPINGS = {
 
 NODE_DISPLAY_NAME_MAPPINGS = {
     "RandomPersonPhoto": "Random Person Photo"
-}
-
-print("[RandomPersonPhoto] Node registration complete") 
\ No newline at end of file
+} 
\ No newline at end of file
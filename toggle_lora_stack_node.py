@@ -3,7 +3,7 @@ class ToggleLoraStackNode:
 
     @classmethod
     def INPUT_TYPES(cls):
-        optional_inputs = {f"input_{i}": ("LORA_STACK",) for i in range(1, cls.MAX_PAIRS + 1)}
+        optional_inputs = {f"input_{i}": ("LORA_STACK", {"lazy": True}) for i in range(1, cls.MAX_PAIRS + 1)}
         return {
             "required": {
                 "enabled": ("BOOLEAN", {"default": True}),
@@ -16,6 +16,12 @@ class ToggleLoraStackNode:
     FUNCTION = "process"
     CATEGORY = "Custom Nodes/Toggles"
 
+    def check_lazy_status(self, enabled, **kwargs):
+        # Disabled stacks are never requested, so their upstream nodes don't run
+        if not enabled:
+            return []
+        return [name for name, value in kwargs.items() if name.startswith("input_") and value is None]
+
     def process(self, enabled, **kwargs):
         outputs = []
         for i in range(1, self.MAX_PAIRS + 1):
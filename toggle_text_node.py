@@ -3,7 +3,7 @@ class ToggleTextNode:
 
     @classmethod
     def INPUT_TYPES(cls):
-        optional_inputs = {f"input_{i}": ("STRING", {"forceInput": True}) for i in range(1, cls.MAX_PAIRS + 1)}
+        optional_inputs = {f"input_{i}": ("STRING", {"forceInput": True, "lazy": True}) for i in range(1, cls.MAX_PAIRS + 1)}
         return {
             "required": {
                 "enabled": ("BOOLEAN", {"default": True}),
@@ -16,6 +16,13 @@ class ToggleTextNode:
     FUNCTION = "process"
     CATEGORY = "Custom Nodes/Toggles"
 
+    def check_lazy_status(self, enabled, **kwargs):
+        # Only ask ComfyUI to evaluate the upstream branches when toggled on;
+        # connected but not yet evaluated lazy inputs arrive here as None.
+        if not enabled:
+            return []
+        return [name for name, value in kwargs.items() if name.startswith("input_") and value is None]
+
     def process(self, enabled, **kwargs):
         outputs = []
         for i in range(1, self.MAX_PAIRS + 1):
@@ -0,0 +1,8 @@
+import os
+import folder_paths
+
+def get_user_data_path(filename):
+    """Path of a pack file under ComfyUI's user directory, in a cyan-image subfolder."""
+    get_user_directory = getattr(folder_paths, "get_user_directory", None)
+    user_dir = get_user_directory() if get_user_directory else os.path.join(folder_paths.base_path, "user")
+    return os.path.join(user_dir, "cyan-image", filename)
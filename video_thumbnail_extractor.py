@@ -1,9 +1,12 @@
-import cv2
 import torch
 import numpy as np
 from nodes import PreviewImage
 import folder_paths
 import os
+from .pack_logging import get_logger
+from .instrumentation import start_execution, attach
+
+logger = get_logger("VideoThumbnailExtractor")
 
 # Register videos folder
 video_extensions = ['.mp4', '.avi', '.mov', '.mkv']
@@ -24,6 +27,19 @@ class VideoThumbnailExtractor(PreviewImage):
             }
         }
 
+    @classmethod
+    def IS_CHANGED(cls, video, frame_number=1, **kwargs):
+        # Re-run when the file on disk changes, not only when the name does.
+        # A linked video arrives as None and can't be checked, so always re-run then.
+        if video is None:
+            return float("nan")
+        video_path = os.path.join(folder_paths.base_path, "videos", video)
+        try:
+            stat = os.stat(video_path)
+        except OSError:
+            return f"{video_path}:missing:{frame_number}"
+        return f"{video_path}:{stat.st_mtime_ns}:{stat.st_size}:{frame_number}"
+
     RETURN_TYPES = ("IMAGE",)
     RETURN_NAMES = ("image",)
     FUNCTION = "extract_thumbnail"
@@ -32,7 +48,10 @@ class VideoThumbnailExtractor(PreviewImage):
     BACKGROUND_COLOR = "#00FFFF"  # Cyan color
 
     def extract_thumbnail(self, video, frame_number=1, filename_prefix="video_thumbnail", prompt=None, extra_pnginfo=None):
-        print(f"[VideoThumbnailExtractor] Processing video: {video}")
+        import cv2  # deferred so loading the pack doesn't pay for OpenCV
+
+        logger.debug("Processing video: %s", video)
+        metrics = start_execution("VideoThumbnailExtractor")
         
         # Get full path to video file
         video_path = os.path.join(folder_paths.base_path, "videos", video)
@@ -40,7 +59,8 @@ class VideoThumbnailExtractor(PreviewImage):
             raise ValueError(f"Could not find video file: {video_path}")
         
         # Read the video using OpenCV
-        cap = cv2.VideoCapture(video_path)
+        with metrics.span("open"):
+            cap = cv2.VideoCapture(video_path)
         if not cap.isOpened():
             raise ValueError(f"Could not open video file: {video_path}")
         
@@ -48,35 +68,40 @@ class VideoThumbnailExtractor(PreviewImage):
         total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
         if frame_number > total_frames:
             frame_number = total_frames
-            print(f"[VideoThumbnailExtractor] Requested frame exceeds video length, using last frame: {frame_number}")
+            logger.warning("Requested frame exceeds video length, using last frame: %d", frame_number)
         
-        # Set the frame position
-        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number - 1)
-        
-        # Read the frame
-        ret, frame = cap.read()
+        with metrics.span("seek_read"):
+            # Set the frame position
+            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number - 1)
+            
+            # Read the frame
+            ret, frame = cap.read()
         if not ret:
             cap.release()
             raise ValueError(f"Failed to read frame {frame_number} from video")
         
         cap.release()
-        print(f"[VideoThumbnailExtractor] Frame {frame_number} extracted successfully")
-        
-        # Convert BGR (OpenCV format) to RGB
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        logger.debug("Frame %d extracted successfully", frame_number)
         
-        # Convert to tensor for ComfyUI
-        frame_np = frame_rgb.astype(np.float32) / 255.0
-        frame_tensor = torch.from_numpy(frame_np).unsqueeze(0)  # Shape: [1, height, width, channels]
-        print(f"[VideoThumbnailExtractor] Thumbnail tensor shape: {frame_tensor.shape}")
+        with metrics.span("decode"):
+            # Convert BGR (OpenCV format) to RGB
+            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            
+            # Convert to tensor for ComfyUI
+            frame_np = frame_rgb.astype(np.float32) / 255.0
+            frame_tensor = torch.from_numpy(frame_np).unsqueeze(0)  # Shape: [1, height, width, channels]
+        metrics.track_tensor(frame_tensor)
+        metrics.count("bytes_in", frame.nbytes)
+        logger.debug("Thumbnail tensor shape: %s", frame_tensor.shape)
         
         # Use PreviewImage's save_images method for UI display
-        result = self.save_images(frame_tensor, filename_prefix, prompt, extra_pnginfo)
-        print(f"[VideoThumbnailExtractor] Thumbnail saved and processed with PreviewImage")
-        print(f"[VideoThumbnailExtractor] Save result: {result}")
+        with metrics.span("preview"):
+            result = self.save_images(frame_tensor, filename_prefix, prompt, extra_pnginfo)
+        logger.info("Extracted frame %d/%d from %s", frame_number, total_frames, video)
         
         # Return both tensor for downstream nodes and UI result for display
-        return {"ui": result.get("ui", {"images": []}), "result": (frame_tensor,)}
+        ui = attach(result.get("ui", {"images": []}), metrics.finish())
+        return {"ui": ui, "result": (frame_tensor,)}
 
 # Register the node
 NODE_CLASS_MAPPINGS = {
@@ -85,6 +110,4 @@ NODE_CLASS_MAPPINGS = {
 
 NODE_DISPLAY_NAME_MAPPINGS = {
     "VideoThumbnailExtractor": "Video Thumbnail Extractor"
-}
-
-print("[VideoThumbnailExtractor] Node registration complete") 
\ No newline at end of file
+} 
\ No newline at end of file
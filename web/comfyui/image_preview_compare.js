@@ -3,6 +3,9 @@ import { api } from "../../scripts/api.js";
 
 console.log("[ImagePreviewCompare] Script loaded");
 
+// Number of frames on each side of the current one requested ahead of time
+const PREFETCH_WINDOW = 2;
+
 class ImagePreviewCompareWidget {
     constructor(name, node) {
         console.log("[ImagePreviewCompare] Widget constructor called");
@@ -108,6 +111,33 @@ class ImagePreviewCompareWidget {
             guideLines.appendChild(line);
         }
 
+        // Pager for batches; only shown when there is more than one frame
+        const pager = document.createElement("div");
+        pager.style.position = "absolute";
+        pager.style.bottom = "4px";
+        pager.style.left = "50%";
+        pager.style.transform = "translateX(-50%)";
+        pager.style.display = "none";
+        pager.style.gap = "6px";
+        pager.style.alignItems = "center";
+        pager.style.zIndex = "4";
+        pager.style.color = "#fff";
+        pager.style.fontSize = "12px";
+        pager.style.backgroundColor = "rgba(0, 0, 0, 0.6)";
+        pager.style.borderRadius = "4px";
+        pager.style.padding = "2px 6px";
+        const prevButton = document.createElement("button");
+        prevButton.textContent = "<";
+        const pageLabel = document.createElement("span");
+        const nextButton = document.createElement("button");
+        nextButton.textContent = ">";
+        pager.appendChild(prevButton);
+        pager.appendChild(pageLabel);
+        pager.appendChild(nextButton);
+        container.appendChild(pager);
+        prevButton.addEventListener("click", () => this.showFrame(this.frameIndex - 1));
+        nextButton.addEventListener("click", () => this.showFrame(this.frameIndex + 1));
+
         // Store references
         this.container = container;
         this.imagesContainer = imagesContainer;
@@ -115,12 +145,19 @@ class ImagePreviewCompareWidget {
         this.image2Container = image2Container;
         this.splitLine = splitLine;
         this.guideLines = guideLines;
+        this.pager = pager;
+        this.pageLabel = pageLabel;
 
         // Initialize state
         this.mode = "split"; // or "opacity"
         this.splitPosition = 50; // percentage
         this.opacity = 0.5; // 0-1
 
+        // Batch state: frames are fetched by handle instead of shipped up front
+        this.batch = null;
+        this.frameIndex = 0;
+        this.prefetched = new Map();
+
         // Setup event listeners
         this.setupEventListeners();
 
@@ -189,6 +226,11 @@ class ImagePreviewCompareWidget {
             return;
         }
 
+        if (value.batch) {
+            this.setBatch(value.batch);
+            return;
+        }
+
         const { images } = value;
         console.log("[ImagePreviewCompare] Images from value:", images);
         
@@ -228,6 +270,76 @@ class ImagePreviewCompareWidget {
         }
     }
 
+    setBatch(batch) {
+        this.batch = batch;
+        this.prefetched.clear();
+        this.frameIndex = 0;
+        const frameCount = Math.max(batch.count_a, batch.count_b);
+        this.pager.style.display = frameCount > 1 ? "flex" : "none";
+        this.showFrame(0);
+    }
+
+    frameUrl(side, index) {
+        const count = side === "a" ? this.batch.count_a : this.batch.count_b;
+        if (count === 0) {
+            return null;
+        }
+        // Shorter batches hold their last frame while paging through the longer one
+        const frameIndex = Math.min(index, count - 1);
+        return api.apiURL(`/cyan-image/compare/${this.batch.handle}/${side}/${frameIndex}`);
+    }
+
+    showFrame(index) {
+        if (!this.batch) {
+            return;
+        }
+        const frameCount = Math.max(this.batch.count_a, this.batch.count_b);
+        if (frameCount === 0) {
+            return;
+        }
+        this.frameIndex = Math.max(0, Math.min(frameCount - 1, index));
+        this.pageLabel.textContent = `${this.frameIndex + 1} / ${frameCount}`;
+
+        const image1Url = this.frameUrl("a", this.frameIndex);
+        const image2Url = this.frameUrl("b", this.frameIndex);
+        this.image1Container.style.backgroundImage = image1Url ? `url(${image1Url})` : "none";
+        this.image2Container.style.backgroundImage = image2Url ? `url(${image2Url})` : "none";
+
+        if (this.mode === "split") {
+            this.updateSplitView();
+        } else {
+            this.updateOpacityView();
+        }
+        this.prefetch(frameCount);
+    }
+
+    prefetch(frameCount) {
+        // Keep only the window around the current frame so big batches stay cheap
+        const wanted = new Set();
+        const start = Math.max(0, this.frameIndex - PREFETCH_WINDOW);
+        const end = Math.min(frameCount - 1, this.frameIndex + PREFETCH_WINDOW);
+        for (let i = start; i <= end; i++) {
+            for (const side of ["a", "b"]) {
+                const url = this.frameUrl(side, i);
+                if (url) {
+                    wanted.add(url);
+                }
+            }
+        }
+        for (const url of this.prefetched.keys()) {
+            if (!wanted.has(url)) {
+                this.prefetched.delete(url);
+            }
+        }
+        for (const url of wanted) {
+            if (!this.prefetched.has(url)) {
+                const img = new Image();
+                img.src = url;
+                this.prefetched.set(url, img);
+            }
+        }
+    }
+
     getValue() {
         return this.value;
     }
@@ -299,6 +411,11 @@ app.registerExtension({
                     
                     // The message might contain an 'images' array directly or nested under ui
                     let images = null;
+                    if (message.compare_batch && message.compare_batch.length > 0) {
+                        console.log("[ImagePreviewCompare] Found compare batch:", message.compare_batch[0]);
+                        this.previewWidget.setValue({ batch: message.compare_batch[0] });
+                        return result;
+                    }
                     if (message.images && Array.isArray(message.images)) {
                         images = message.images;
                         console.log("[ImagePreviewCompare] Found images array directly:", images);
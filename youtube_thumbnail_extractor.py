@@ -1,5 +1,4 @@
 import re
-import requests
 from io import BytesIO
 import torch
 import numpy as np
@@ -8,7 +7,51 @@ from nodes import PreviewImage
 from urllib.parse import urlparse
 import os
 import string
-import imageio  # <-- add this import
+import threading
+import time
+from .pack_logging import get_logger
+from .instrumentation import StageRecorder, start_execution, attach, timed_get
+from .network_prefetch import network_prefetcher, io_executor
+from .disk_writer import image_writer, get_save_directory
+
+logger = get_logger("YouTubeThumbnailExtractor")
+
+# Endpoints as module constants so they can be pointed at a local server (see benchmarks/)
+THUMBNAIL_URL_TEMPLATE = "https://img.youtube.com/vi/{video_id}/{quality}.jpg"
+OEMBED_URL_TEMPLATE = "https://www.youtube.com/oembed?url=https://www.youtube.com/watch?v={video_id}&format=json"
+# Where fetched images are kept: absolute paths or subfolders of ComfyUI's input directory
+INTERNET_IMG_DIR_ENV = "CYAN_IMAGE_INTERNET_IMG_DIR"
+YT_THUMBNAIL_DIR_ENV = "CYAN_IMAGE_YT_THUMBNAIL_DIR"
+# Browser-like headers for direct image downloads
+DOWNLOAD_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
+}
+
+# (url, cache_ttl) -> time the current cache entry started
+_cache_started = {}
+_cache_lock = threading.Lock()
+
+def _cache_start(url, cache_ttl):
+    """
+    Start time of the cache entry for url, renewed once cache_ttl seconds
+    have passed since it began, so every fetch is reused for the full TTL.
+    """
+    now = time.time()
+    key = (url, cache_ttl)
+    with _cache_lock:
+        started = _cache_started.get(key)
+        if started is None or now - started >= cache_ttl:
+            started = _cache_started[key] = now
+            if len(_cache_started) > 256:
+                for old_key, old_started in list(_cache_started.items()):
+                    if now - old_started >= old_key[1]:
+                        del _cache_started[old_key]
+    return started
+
+def _prefetch_key(url, cache_ttl):
+    # Matches IS_CHANGED, so a prefetched result lives as long as the cache entry
+    started = _cache_start(url, cache_ttl) if cache_ttl > 0 else None
+    return ("YouTubeThumbnailExtractor", url, started)
 
 class YouTubeThumbnailExtractor(PreviewImage):
     def __init__(self):
@@ -20,9 +63,31 @@ class YouTubeThumbnailExtractor(PreviewImage):
         return {
             "required": {
                 "url": ("STRING", {"default": ""}),
+            },
+            "optional": {
+                # Seconds a fetched thumbnail is reused for the same URL, 0 always refetches
+                "cache_ttl": ("INT", {"default": 3600, "min": 0, "max": 604800, "step": 60}),
             }
         }
 
+    @classmethod
+    def IS_CHANGED(cls, url, cache_ttl=3600, **kwargs):
+        # Linked inputs arrive as None; without the URL or TTL there is nothing to key on
+        if url is None or cache_ttl is None or cache_ttl <= 0:
+            return float("nan")
+        # The key only changes once the TTL has passed, so re-queued prompts reuse the cached image
+        return f"{url}:{_cache_start(url, cache_ttl)}"
+
+    @classmethod
+    def prefetch(cls, inputs):
+        """Start downloading as soon as the prompt is queued (see network_prefetch)."""
+        # A linked url or cache_ttl isn't known yet, and guessing it would give a key nobody takes
+        url = inputs.get("url")
+        if not url or "cache_ttl" not in inputs:
+            return
+        cache_ttl = inputs["cache_ttl"]
+        network_prefetcher.prefetch(_prefetch_key(url, cache_ttl), cls._fetch, url, shared=cache_ttl > 0)
+
     RETURN_TYPES = ("IMAGE",)
     RETURN_NAMES = ("image",)
     FUNCTION = "extract_thumbnail"
@@ -30,97 +95,136 @@ class YouTubeThumbnailExtractor(PreviewImage):
     OUTPUT_NODE = True
     BACKGROUND_COLOR = "#00FFFF"  # Cyan color
 
-    def extract_thumbnail(self, url, filename_prefix="youtube_thumbnail", prompt=None, extra_pnginfo=None):
-        print(f"[YouTubeThumbnailExtractor] Processing URL: {url}")
-        is_youtube = False
-        is_short = False
-        # Check if it's a direct image URL
-        if self._is_image_url(url):
-            print(f"[YouTubeThumbnailExtractor] Detected direct image URL")
-            image_tensor, pil_image, save_name = self._download_image(url, return_pil=True)
-            save_dir = r"E:\ComfyUI\input\Internet-Img"
-            save_path = self._get_unique_path(save_dir, save_name)
+    def extract_thumbnail(self, url, cache_ttl=3600, filename_prefix="youtube_thumbnail", prompt=None, extra_pnginfo=None):
+        logger.debug("Processing URL: %s", url)
+        metrics = start_execution("YouTubeThumbnailExtractor")
+        # Only the wait for a prefetch (or the fetch itself, if none was
+        # started) and the decode below happen on the execution thread
+        with metrics.span("wait"):
+            fetched = network_prefetcher.get(_prefetch_key(url, cache_ttl), self._fetch, url, shared=cache_ttl > 0)
+        network = fetched.pop("network", None)
+        if network is not None:
+            metrics.merge(network)
         else:
-            # Extract video ID from URL
-            video_id = self._extract_video_id(url)
-            if not video_id:
-                raise ValueError("Could not extract video ID from the provided URL")
-            is_youtube = True
-            if "youtube.com/shorts/" in url:
-                is_short = True
-            print(f"[YouTubeThumbnailExtractor] Extracted Video ID: {video_id}")
-            # Try to get the largest thumbnail (maxresdefault)
-            thumbnail_url = f"https://img.youtube.com/vi/{video_id}/maxresdefault.jpg"
-            print(f"[YouTubeThumbnailExtractor] Attempting to fetch thumbnail from: {thumbnail_url}")
-            # Fetch the image
-            response = requests.get(thumbnail_url, timeout=10)
-            if response.status_code != 200:
-                # Fallback to hqdefault if maxresdefault is not available
-                thumbnail_url = f"https://img.youtube.com/vi/{video_id}/hqdefault.jpg"
-                print(f"[YouTubeThumbnailExtractor] Max resolution not available, falling back to: {thumbnail_url}")
-                response = requests.get(thumbnail_url, timeout=10)
-                if response.status_code != 200:
-                    raise ValueError(f"Failed to fetch thumbnail. Status code: {response.status_code}")
-            print(f"[YouTubeThumbnailExtractor] Thumbnail fetched successfully")
-            image_tensor, pil_image, _ = self._download_image(thumbnail_url, return_pil=True)
-            if is_short:
+            metrics.count("cache_hits")
+
+        with metrics.span("decode"):
+            pil_image = self._decode_image(fetched["content"], fetched["url"], fetched["content_type"])
+            if fetched["is_short"]:
                 # Crop to central 400x720 region (remove extended left/right)
-                print(f"[YouTubeThumbnailExtractor] Detected Shorts. Cropping thumbnail to 400x720 from center.")
+                logger.debug("Detected Shorts. Cropping thumbnail to 400x720 from center.")
                 left = (1280 - 400) // 2
                 upper = 0
                 right = left + 400
                 lower = 720
                 pil_image = pil_image.crop((left, upper, right, lower))
-                image_np = np.array(pil_image).astype(np.float32) / 255.0
-                image_tensor = torch.from_numpy(image_np).unsqueeze(0)
-            save_dir = r"E:\ComfyUI\input\YT-thumbnails"
+            image_np = np.array(pil_image).astype(np.float32) / 255.0
+            image_tensor = torch.from_numpy(image_np).unsqueeze(0)
+        logger.debug("Image tensor shape: %s", image_tensor.shape)
+
+        if fetched["video_id"] is None:
+            parsed = urlparse(url)
+            base = os.path.basename(parsed.path)
+            save_name = base if base else "downloaded_image.jpg"
+            save_dir = get_save_directory(INTERNET_IMG_DIR_ENV, "Internet-Img")
+            save_path = image_writer.reserve_path(save_dir, save_name)
+        else:
+            save_dir = get_save_directory(YT_THUMBNAIL_DIR_ENV, "YT-thumbnails")
             # Get video title for filename
-            video_title = self._get_youtube_title(video_id)
-            if not video_title:
-                video_title = video_id
+            video_title = fetched["title"] or fetched["video_id"]
             save_name = self._sanitize_filename(video_title) + ".jpg"
-            save_path = os.path.join(save_dir, save_name)
-        # Save the image to the appropriate directory
-        os.makedirs(save_dir, exist_ok=True)
-        pil_image.save(save_path)
-        print(f"[YouTubeThumbnailExtractor] Image saved to: {save_path}")
+            # Same title overwrites the previous thumbnail, as before
+            save_path = image_writer.reserve_path(save_dir, save_name, unique=False)
+        # Save the image to the appropriate directory off the execution thread
+        with metrics.span("save"):
+            image_writer.submit(pil_image, save_path)
+        logger.info("Image queued for saving to: %s", save_path)
         # Use PreviewImage's save_images method for UI display
-        result = self.save_images(image_tensor, filename_prefix, prompt, extra_pnginfo)
-        print(f"[YouTubeThumbnailExtractor] Image saved and processed with PreviewImage")
-        print(f"[YouTubeThumbnailExtractor] Save result: {result}")
+        with metrics.span("preview"):
+            result = self.save_images(image_tensor, filename_prefix, prompt, extra_pnginfo)
+        metrics.track_tensor(image_tensor)
         # Return both tensor for downstream nodes and UI result for display
-        return {"ui": result.get("ui", {"images": []}), "result": (image_tensor,)}
+        ui = attach(result.get("ui", {"images": []}), metrics.finish())
+        return {"ui": ui, "result": (image_tensor,)}
 
-    def _is_image_url(self, url):
+    @classmethod
+    def _fetch(cls, url):
+        """
+        Download the raw bytes for a URL on the calling (usually background)
+        thread. YouTube thumbnails are fetched together with the video title.
+        """
+        network = StageRecorder()
+        # Check if it's a direct image URL
+        if cls._is_image_url(url):
+            logger.debug("Detected direct image URL")
+            response = timed_get(network, url, headers=DOWNLOAD_HEADERS, timeout=10)
+            if response.status_code != 200:
+                raise ValueError(f"Failed to download image. Status code: {response.status_code}")
+            return {
+                "url": url,
+                "content": response.content,
+                "content_type": response.headers.get("Content-Type", ""),
+                "video_id": None,
+                "is_short": False,
+                "title": None,
+                "network": network,
+            }
+
+        # Extract video ID from URL
+        video_id = cls._extract_video_id(url)
+        if not video_id:
+            raise ValueError("Could not extract video ID from the provided URL")
+        logger.debug("Extracted Video ID: %s", video_id)
+        # The title is only needed for the file name, so fetch it alongside the image
+        title_network = StageRecorder()
+        title_future = io_executor.submit(cls._get_youtube_title, video_id, title_network)
+
+        # Try to get the largest thumbnail (maxresdefault)
+        thumbnail_url = THUMBNAIL_URL_TEMPLATE.format(video_id=video_id, quality="maxresdefault")
+        logger.debug("Attempting to fetch thumbnail from: %s", thumbnail_url)
+        response = timed_get(network, thumbnail_url, timeout=10)
+        if response.status_code != 200:
+            # Fallback to hqdefault if maxresdefault is not available
+            thumbnail_url = THUMBNAIL_URL_TEMPLATE.format(video_id=video_id, quality="hqdefault")
+            logger.debug("Max resolution not available, falling back to: %s", thumbnail_url)
+            response = timed_get(network, thumbnail_url, timeout=10)
+            if response.status_code != 200:
+                raise ValueError(f"Failed to fetch thumbnail. Status code: {response.status_code}")
+        logger.debug("Thumbnail fetched successfully")
+
+        title = title_future.result()
+        network.merge(title_network)
+        return {
+            "url": thumbnail_url,
+            "content": response.content,
+            "content_type": response.headers.get("Content-Type", ""),
+            "video_id": video_id,
+            "is_short": "youtube.com/shorts/" in url,
+            "title": title,
+            "network": network,
+        }
+
+    @staticmethod
+    def _is_image_url(url):
         """Check if the URL points to an image file, ignoring query parameters."""
         image_extensions = ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp']
         path = urlparse(url).path  # Only check the path part
         return any(path.lower().endswith(ext) for ext in image_extensions)
 
-    def _download_image(self, url, return_pil=False):
-        """Download and convert image, GIF, or MP4 to tensor. Optionally return PIL image and filename."""
-        # Set headers for browser-like request
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
-        }
-        response = requests.get(url, headers=headers, timeout=10)
-        if response.status_code != 200:
-            raise ValueError(f"Failed to download image. Status code: {response.status_code}")
-        content_type = response.headers.get('Content-Type', '')
-        parsed = urlparse(url)
-        base = os.path.basename(parsed.path)
-        save_name = base if base else "downloaded_image.jpg"
+    def _decode_image(self, content, url, content_type):
+        """Decode downloaded image, GIF, or MP4 bytes to an RGB PIL image."""
         # Handle GIF
         if url.lower().endswith('.gif') or 'gif' in content_type:
-            pil_image = Image.open(BytesIO(response.content))
+            pil_image = Image.open(BytesIO(content))
             pil_image.seek(0)  # First frame
             pil_image = pil_image.convert("RGB")
         # Handle MP4
         elif url.lower().endswith('.mp4') or 'mp4' in content_type:
             # Save to temp file
             import tempfile
+            import imageio
             with tempfile.NamedTemporaryFile(suffix='.mp4', delete=False) as tmp:
-                tmp.write(response.content)
+                tmp.write(content)
                 tmp_path = tmp.name
             # Read first frame
             reader = imageio.get_reader(tmp_path)
@@ -129,15 +233,11 @@ class YouTubeThumbnailExtractor(PreviewImage):
             pil_image = Image.fromarray(frame).convert("RGB")
             os.remove(tmp_path)
         else:
-            pil_image = Image.open(BytesIO(response.content)).convert("RGB")
-        image_np = np.array(pil_image).astype(np.float32) / 255.0
-        image_tensor = torch.from_numpy(image_np).unsqueeze(0)
-        print(f"[YouTubeThumbnailExtractor] Image tensor shape: {image_tensor.shape}")
-        if return_pil:
-            return image_tensor, pil_image, save_name
-        return image_tensor
-
-    def _extract_video_id(self, url):
+            pil_image = Image.open(BytesIO(content)).convert("RGB")
+        return pil_image
+
+    @staticmethod
+    def _extract_video_id(url):
         # Regular expressions to match various YouTube URL formats, including Shorts
         patterns = [
             r"youtube\.com/watch\?v=([\w-]{11})",
@@ -152,16 +252,17 @@ class YouTubeThumbnailExtractor(PreviewImage):
                 return match.group(1)
         return None
 
-    def _get_youtube_title(self, video_id):
+    @staticmethod
+    def _get_youtube_title(video_id, network):
         """Fetch the YouTube video title using oEmbed (no API key required)."""
         try:
-            oembed_url = f"https://www.youtube.com/oembed?url=https://www.youtube.com/watch?v={video_id}&format=json"
-            resp = requests.get(oembed_url, timeout=10)
+            oembed_url = OEMBED_URL_TEMPLATE.format(video_id=video_id)
+            resp = timed_get(network, oembed_url, timeout=10)
             if resp.status_code == 200:
                 data = resp.json()
                 return data.get("title", None)
         except Exception as e:
-            print(f"[YouTubeThumbnailExtractor] Failed to fetch video title: {e}")
+            logger.warning("Failed to fetch video title: %s", e)
         return None
 
     def _sanitize_filename(self, name):
@@ -170,15 +271,6 @@ class YouTubeThumbnailExtractor(PreviewImage):
         sanitized = ''.join(c if c in valid_chars else '_' for c in name)
         return sanitized.strip()
 
-    def _get_unique_path(self, directory, filename):
-        """Append underscores to filename until it is unique in the directory."""
-        base, ext = os.path.splitext(filename)
-        candidate = filename
-        while os.path.exists(os.path.join(directory, candidate)):
-            base += '_'
-            candidate = base + ext
-        return os.path.join(directory, candidate)
-
 # Register the node
 NODE_CLASS_MAPPINGS = {
     "YouTubeThumbnailExtractor": YouTubeThumbnailExtractor
@@ -186,6 +278,4 @@ NODE_CLASS_MAPPINGS = {
 
 NODE_DISPLAY_NAME_MAPPINGS = {
     "YouTubeThumbnailExtractor": "YouTube Thumbnail Extractor"
-}
-
-print("[YouTubeThumbnailExtractor] Node registration complete") 
\ No newline at end of file
+} 
\ No newline at end of file